@@ -9,8 +9,10 @@ the guardrail_server.py to handle model inference.
 
 Server must be running at: http://localhost:8004
 """
+import hashlib
 import logging
 import os
+from collections import OrderedDict
 from typing import Any, Callable
 
 import httpx
@@ -30,6 +32,14 @@ GUARDRAIL_ENABLED = os.getenv("GUARDRAIL_ENABLED", "true").lower() == "true"
 INJECTION_THRESHOLD = float(os.getenv("INJECTION_THRESHOLD", "0.5"))
 TOXICITY_THRESHOLD = float(os.getenv("TOXICITY_THRESHOLD", "0.5"))
 
+# Connection pool settings. Keep idle connections around for longer than the
+# gap between agent turns so each guardrail check reuses an open connection.
+GUARDRAIL_MAX_KEEPALIVE_CONNECTIONS = 20
+GUARDRAIL_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# Maximum number of cached detection results per check type
+GUARDRAIL_CACHE_SIZE = 4096
+
 
 # =============================================================================
 # Async API Client
@@ -62,8 +72,37 @@ class GuardrailClient:
         self._client = http_client
         self._owns_client = http_client is None
 
+        # Detection verdicts are deterministic for a given model, text and
+        # threshold, so repeated texts are answered from an LRU cache
+        self._injection_cache: OrderedDict[tuple[bytes, float], tuple[bool, float, str]] = OrderedDict()
+        self._toxicity_cache: OrderedDict[tuple[bytes, float], tuple[bool, float, str]] = OrderedDict()
+
         logger.info(f"GuardrailClient initialized (server={self.base_url})")
 
+    @staticmethod
+    def _cache_key(text: str, threshold: float) -> tuple[bytes, float]:
+        """Build a compact cache key from the text digest and threshold."""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest(), threshold
+
+    @staticmethod
+    def _cache_get(
+        cache: OrderedDict, key: tuple[bytes, float]
+    ) -> tuple[bool, float, str] | None:
+        """Look up a cached result, marking it as recently used."""
+        result = cache.get(key)
+        if result is not None:
+            cache.move_to_end(key)
+        return result
+
+    @staticmethod
+    def _cache_put(
+        cache: OrderedDict, key: tuple[bytes, float], result: tuple[bool, float, str]
+    ) -> None:
+        """Store a result, evicting the least recently used entry when full."""
+        cache[key] = result
+        if len(cache) > GUARDRAIL_CACHE_SIZE:
+            cache.popitem(last=False)
+
     @property
     def client(self) -> httpx.AsyncClient:
         """Lazy-initialize the HTTP client if not provided."""
@@ -71,6 +110,10 @@ class GuardrailClient:
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_keepalive_connections=GUARDRAIL_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GUARDRAIL_KEEPALIVE_EXPIRY_SECONDS,
+                ),
             )
             self._owns_client = True
         return self._client
@@ -98,6 +141,11 @@ class GuardrailClient:
         Returns:
             Tuple of (is_injection, score, label)
         """
+        cache_key = self._cache_key(text, threshold)
+        cached = self._cache_get(self._injection_cache, cache_key)
+        if cached is not None:
+            return cached
+
         try:
             response = await self.client.post(
                 f"{self.base_url}/detect/injection",
@@ -105,7 +153,9 @@ class GuardrailClient:
             )
             response.raise_for_status()
             data = response.json()
-            return data["detected"], data["score"], data["label"]
+            result = data["detected"], data["score"], data["label"]
+            self._cache_put(self._injection_cache, cache_key, result)
+            return result
         except httpx.HTTPStatusError as e:
             logger.error(f"Injection detection API error: {e}")
             # Fail open on API errors (configurable behavior)
@@ -127,6 +177,11 @@ class GuardrailClient:
         Returns:
             Tuple of (is_toxic, score, label)
         """
+        cache_key = self._cache_key(text, threshold)
+        cached = self._cache_get(self._toxicity_cache, cache_key)
+        if cached is not None:
+            return cached
+
         try:
             response = await self.client.post(
                 f"{self.base_url}/detect/toxicity",
@@ -134,7 +189,9 @@ class GuardrailClient:
             )
             response.raise_for_status()
             data = response.json()
-            return data["detected"], data["score"], data["label"]
+            result = data["detected"], data["score"], data["label"]
+            self._cache_put(self._toxicity_cache, cache_key, result)
+            return result
         except httpx.HTTPStatusError as e:
             logger.error(f"Toxicity detection API error: {e}")
             return False, 0.0, "ERROR"
@@ -175,12 +232,14 @@ class GuardrailMiddleware(AgentMiddleware):
         # Input guardrail settings
         enable_input_guardrail: bool = True,
         injection_threshold: float = INJECTION_THRESHOLD,
+        min_input_len: int = 4,
         input_refusal_message: str = (
             "I cannot help you with this. This incident has been logged and reported."
         ),
         # Output guardrail settings
         enable_output_guardrail: bool = True,
         toxicity_threshold: float = TOXICITY_THRESHOLD,
+        min_output_len: int = 4,
         output_refusal_message: str = (
             "I apologize, but I cannot provide that response as it may "
             "contain inappropriate content."
@@ -199,9 +258,11 @@ class GuardrailMiddleware(AgentMiddleware):
             enabled: Global toggle for guardrails (can be set via GUARDRAIL_ENABLED env var)
             enable_input_guardrail: Whether to check inputs for prompt injection
             injection_threshold: Confidence threshold (0.0-1.0) for blocking injections
+            min_input_len: Inputs shorter than this are not sent for injection checks
             input_refusal_message: Message returned when input is blocked
             enable_output_guardrail: Whether to check outputs for toxicity
             toxicity_threshold: Confidence threshold (0.0-1.0) for blocking toxic output
+            min_output_len: Outputs shorter than this are not sent for toxicity checks
             output_refusal_message: Message returned when output is blocked
             on_injection_detected: Optional callback when injection is detected
             on_toxicity_detected: Optional callback when toxicity is detected
@@ -213,6 +274,8 @@ class GuardrailMiddleware(AgentMiddleware):
         self.enable_output_guardrail = enable_output_guardrail
         self.injection_threshold = injection_threshold
         self.toxicity_threshold = toxicity_threshold
+        self.min_input_len = min_input_len
+        self.min_output_len = min_output_len
         self.input_refusal_message = input_refusal_message
         self.output_refusal_message = output_refusal_message
         self.on_injection_detected = on_injection_detected
@@ -239,6 +302,21 @@ class GuardrailMiddleware(AgentMiddleware):
         """Get the API client."""
         return self._client
 
+    @staticmethod
+    def _message_text(content: Any) -> str:
+        """Extract plain text from message content (a string or content blocks)."""
+        if isinstance(content, str):
+            return content
+        elif isinstance(content, list):
+            return " ".join([
+                block if isinstance(block, str) else block.get("text", "")
+                for block in content
+                if isinstance(block, str)
+                or (isinstance(block, dict) and block.get("type") == "text")
+            ])
+
+        return str(content)
+
     def _get_last_user_message(self, state: AgentState) -> str | None:
         """Extract the last user message from state."""
         messages = state.get("messages", [])
@@ -250,19 +328,7 @@ class GuardrailMiddleware(AgentMiddleware):
         if not isinstance(last_message, HumanMessage):
             return None
 
-        content = last_message.content
-        if isinstance(content, str):
-            return content
-        elif isinstance(content, list):
-            text_parts = []
-            for block in content:
-                if isinstance(block, str):
-                    text_parts.append(block)
-                elif isinstance(block, dict) and block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-            return " ".join(text_parts)
-
-        return str(content)
+        return self._message_text(last_message.content)
 
     def _get_last_ai_message(self, state: AgentState) -> str | None:
         """Extract the last AI message from state."""
@@ -275,11 +341,21 @@ class GuardrailMiddleware(AgentMiddleware):
         if not isinstance(last_message, AIMessage):
             return None
 
-        content = last_message.content
-        if isinstance(content, str):
-            return content
+        return self._message_text(last_message.content)
 
-        return str(content)
+    async def prefetch_input_check(self, user_input: str) -> None:
+        """
+        Start the injection check for user_input ahead of the agent run.
+
+        Callers can overlap this with other setup I/O; abefore_agent still
+        performs the check, but is then served from the client's result cache.
+        """
+        if not self.enabled or not self.enable_input_guardrail:
+            return
+        if len(user_input) < self.min_input_len:
+            return
+
+        await self._client.detect_injection(user_input, self.injection_threshold)
 
     @hook_config(can_jump_to=["end"])
     def before_agent(
@@ -303,7 +379,8 @@ class GuardrailMiddleware(AgentMiddleware):
             return None
 
         user_input = self._get_last_user_message(state)
-        if not user_input:
+        if not user_input or len(user_input) < self.min_input_len:
+            # Trivial inputs ("ok", "yes") can't carry an injection
             return None
 
         # Call the API for prompt injection detection
@@ -353,7 +430,7 @@ class GuardrailMiddleware(AgentMiddleware):
             return None
 
         agent_output = self._get_last_ai_message(state)
-        if not agent_output:
+        if not agent_output or len(agent_output) < self.min_output_len:
             return None
 
         # Call the API for toxicity detection
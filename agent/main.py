@@ -351,8 +351,14 @@ async def stream_agent_response(
     """
     session_id = None
     try:
-        # Create MCP session for this agent invocation
-        session_id = await create_mcp_session(access_token, refresh_token, scopes, user_id)
+        # Create MCP session for this agent invocation. The input guardrail
+        # check runs alongside it so its round-trip is off the critical path
+        # (the middleware's before_agent check then hits the client cache).
+        session_id, _ = await asyncio.gather(
+            create_mcp_session(access_token, refresh_token, scopes, user_id),
+            guardrails_middleware.prefetch_input_check(user_message)
+            if guardrails_middleware else asyncio.sleep(0),
+        )
 
         # Create agent with session-specific MCP client
         logger.info(f"[Agent] Creating agent for session: {session_id[:16]}...")
@@ -97,7 +97,7 @@ async function fetchUserInfo() {
     userInfo = await response.json();
 }
 
-// Token refresh is handled by the MCP server's global heartbeat during agent invocations
+// Token refresh is handled by the MCP server's refresh scheduler
 // OIDC tokens are passed with each chat request to the agent
 // The agent creates/deletes MCP sessions per invocation (not per browser session)
 
@@ -186,4 +186,4 @@ function checkExistingSession() {
     // Could implement session persistence here
 }
 
-// Manual token refresh removed - MCP server's global heartbeat handles token lifecycle
+// Manual token refresh removed - MCP server's refresh scheduler handles token lifecycle
@@ -6,7 +6,7 @@ it in the Authorization header.
 """
 import httpx
 import json
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 import logging
 
 from .config import SERVICES_BASE_URL, TOOL_SCOPE_REQUIREMENTS
@@ -102,29 +102,81 @@ class CapitalPlanningAPIClient:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
-            if response.status_code == 401:
-                raise AuthenticationError(
-                    "API returned 401 Unauthorized. Token may have been revoked."
-                )
-            elif response.status_code == 403:
-                raise AuthorizationError(
-                    f"API returned 403 Forbidden. User lacks permission for this operation."
-                )
-            elif response.status_code == 404:
-                raise APIError("Resource not found", status_code=404)
-            elif response.status_code >= 400:
-                error_detail = response.text
-                raise APIError(
-                    f"API error {response.status_code}: {error_detail}",
-                    status_code=response.status_code
-                )
-
+            self._raise_for_status(response)
             return response.json()
 
         except httpx.RequestError as e:
             logger.error(f"[APIClient] Network error: {e}")
             raise APIError(f"Network error: {e}")
 
+    async def _stream_lines(
+        self,
+        endpoint: str,
+        session_id: str,
+        required_scopes: list[str],
+        params: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """Make an authenticated streaming GET request and yield response lines.
+        
+        Used for NDJSON endpoints so callers can process records as they
+        arrive instead of waiting for the full body.
+        
+        Args:
+            endpoint: API endpoint path
+            session_id: Session ID for authentication
+            required_scopes: Scopes required for this operation
+            params: Query parameters
+            
+        Yields:
+            Non-empty lines of the response body
+            
+        Raises:
+            AuthenticationError: If authentication fails
+            AuthorizationError: If user lacks required scopes
+            APIError: If the API request fails
+        """
+        token_manager.check_authorization(session_id, required_scopes)
+        access_token = await token_manager.ensure_valid_token(session_id)
+
+        client = await self._get_http_client()
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        logger.debug(f"[APIClient] GET {endpoint} (stream) - session {session_id[:8]}...")
+
+        try:
+            async with client.stream("GET", endpoint, params=params, headers=headers) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    self._raise_for_status(response)
+
+                async for line in response.aiter_lines():
+                    if line:
+                        yield line
+
+        except httpx.RequestError as e:
+            logger.error(f"[APIClient] Network error: {e}")
+            raise APIError(f"Network error: {e}")
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        """Map an error response to the matching exception."""
+        if response.status_code == 401:
+            raise AuthenticationError(
+                "API returned 401 Unauthorized. Token may have been revoked."
+            )
+        elif response.status_code == 403:
+            raise AuthorizationError(
+                f"API returned 403 Forbidden. User lacks permission for this operation."
+            )
+        elif response.status_code == 404:
+            raise APIError("Resource not found", status_code=404)
+        elif response.status_code >= 400:
+            error_detail = response.text
+            raise APIError(
+                f"API error {response.status_code}: {error_detail}",
+                status_code=response.status_code
+            )
+
     # ==========================================================================
     # Asset Service Methods
     # ==========================================================================
@@ -152,6 +204,28 @@ class CapitalPlanningAPIClient:
         )
         return [Asset(**asset) for asset in data]
 
+    async def iter_assets(
+        self,
+        session_id: str,
+        portfolio_id: str = "default"
+    ) -> AsyncIterator[Asset]:
+        """Stream the assets in a portfolio as they arrive.
+        
+        Args:
+            session_id: Authenticated session ID
+            portfolio_id: Portfolio to fetch assets from
+            
+        Yields:
+            Asset objects, one per NDJSON line
+        """
+        async for line in self._stream_lines(
+            endpoint="/assets/stream",
+            session_id=session_id,
+            required_scopes=TOOL_SCOPE_REQUIREMENTS["capital_get_assets"],
+            params={"portfolio_id": portfolio_id},
+        ):
+            yield Asset(**json.loads(line))
+
     async def get_asset(
         self,
         session_id: str,
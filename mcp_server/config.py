@@ -15,11 +15,16 @@ TOKEN_REFRESH_BUFFER_SECONDS = 2
 # Logging
 LOG_TOKEN_EVENTS = os.getenv("LOG_TOKEN_EVENTS", "true").lower() == "true"
 
-# Token refresh heartbeat (in seconds)
-# This must be less than the ACCESS token lifetime to ensure tokens are always fresh.
-# The heartbeat is the ONLY place tokens are refreshed (no on-demand refresh).
-# Access tokens expire in 10s, so 8s ensures ~2s buffer before expiry.
+# Token refresh scheduling (in seconds)
+# The refresh scheduler is the ONLY place tokens are refreshed (no on-demand refresh).
+# Each session is refreshed TOKEN_REFRESH_BUFFER_SECONDS before its tokens expire.
+# With FORCE_HEARTBEAT_REFRESH, sessions are also refreshed at least every
+# TOKEN_REFRESH_HEARTBEAT_SECONDS, which is useful for demoing refresh token rotation.
 TOKEN_REFRESH_HEARTBEAT_SECONDS = int(os.getenv("TOKEN_REFRESH_HEARTBEAT_SECONDS", "8"))
+FORCE_HEARTBEAT_REFRESH = os.getenv("FORCE_HEARTBEAT_REFRESH", "false").lower() == "true"
+
+# Delay before retrying a refresh that failed with a transient error
+TOKEN_REFRESH_RETRY_SECONDS = 1
 
 # Scope to tool mapping - defines which scopes are required for each tool
 TOOL_SCOPE_REQUIREMENTS = {
@@ -10,7 +10,7 @@ Architecture:
 - REST API at /sessions/* for session management (tokens never touch MCP/agent)
 - MCP endpoint at /mcp for agent tool calls
 - TokenManager handles OAuth token lifecycle with automatic refresh
-- Global heartbeat refreshes tokens for all sessions to prevent expiration
+- Refresh scheduler refreshes each session's tokens shortly before they expire
 
 Run with:
     uvicorn mcp_server.main:app --port 8002
@@ -29,7 +29,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from mcp.server.fastmcp import FastMCP
 from fastmcp.server.dependencies import get_http_headers
 
-from .config import TOOL_SCOPE_REQUIREMENTS, TOKEN_REFRESH_HEARTBEAT_SECONDS
+from .config import TOOL_SCOPE_REQUIREMENTS
 from .models import (
     GetAssetsInput,
     GetAssetInput,
@@ -278,52 +278,11 @@ async def capital_session_info() -> str:
 
 
 # ==============================================================================
-# Token Refresh Heartbeat
+# Token Refresh Scheduler
 # ==============================================================================
 
-# Global heartbeat task reference
-_heartbeat_task: Optional[asyncio.Task] = None
-
-
-async def token_refresh_heartbeat():
-    """Background task that periodically refreshes tokens for all sessions.
-
-    This runs independently of tool calls to ensure tokens don't expire
-    during long-running workflows or long-duration individual tool calls.
-    """
-    logger.info(
-        f"[Heartbeat] Token refresh heartbeat started "
-        f"(interval: {TOKEN_REFRESH_HEARTBEAT_SECONDS}s)"
-    )
-
-    try:
-        while True:
-            await asyncio.sleep(TOKEN_REFRESH_HEARTBEAT_SECONDS)
-
-            try:
-                stats = await token_manager.refresh_all_sessions()
-
-                if stats["total_sessions"] > 0:
-                    logger.info(
-                        f"[Heartbeat] Refresh cycle complete: "
-                        f"total={stats['total_sessions']}, "
-                        f"refreshed={stats['refreshed']}, "
-                        f"failed={stats['failed']}"
-                    )
-
-                    if stats["failed"] > 0:
-                        logger.warning(
-                            f"[Heartbeat] {stats['failed']} session(s) failed to refresh: "
-                            f"{stats['errors']}"
-                        )
-
-            except Exception as e:
-                logger.error(f"[Heartbeat] Error during refresh cycle: {e}", exc_info=True)
-                # Don't crash the heartbeat - log and continue
-
-    except asyncio.CancelledError:
-        logger.info("[Heartbeat] Token refresh heartbeat stopped")
-        raise
+# Global refresh scheduler task reference
+_refresh_task: Optional[asyncio.Task] = None
 
 
 # ==============================================================================
@@ -336,15 +295,15 @@ async def app_lifespan(app: FastAPI):
 
     The MCP session manager must be started for streamable HTTP to work.
     Our TokenManager/SessionManager are initialized at module level.
-    Starts the global token refresh heartbeat.
+    Starts the token refresh scheduler.
     """
-    global _heartbeat_task
+    global _refresh_task
 
     logger.info("[Server] Starting Capital Planning API + MCP Server")
 
-    # Start the token refresh heartbeat
-    _heartbeat_task = asyncio.create_task(token_refresh_heartbeat())
-    logger.info("[Server] Token refresh heartbeat task started")
+    # Start the token refresh scheduler
+    _refresh_task = asyncio.create_task(token_manager.run_refresh_scheduler())
+    logger.info("[Server] Token refresh scheduler task started")
 
     # Start MCP's session manager (required for streamable HTTP transport)
     async with mcp.session_manager.run():
@@ -353,11 +312,11 @@ async def app_lifespan(app: FastAPI):
     # Cleanup on shutdown
     logger.info("[Server] Shutting down...")
 
-    # Cancel the heartbeat task
-    if _heartbeat_task:
-        _heartbeat_task.cancel()
+    # Cancel the refresh scheduler task
+    if _refresh_task:
+        _refresh_task.cancel()
         try:
-            await asyncio.wait_for(_heartbeat_task, timeout=5.0)
+            await asyncio.wait_for(_refresh_task, timeout=5.0)
         except (asyncio.CancelledError, asyncio.TimeoutError):
             pass
 
@@ -426,7 +385,7 @@ async def create_session(request: CreateSessionRequest):
         session_id = await token_manager.create_session(
             access_token=request.access_token,
             refresh_token=request.refresh_token,
-            expires_in=request.expires_in or 1,  # Default to 1s, heartbeat will refresh
+            expires_in=request.expires_in or 1,  # Default to 1s, scheduler will refresh
             refresh_expires_in=request.refresh_expires_in or 3600,  # Default to 1h
             scopes=request.scopes,
             user_id=request.user_id,
@@ -31,6 +31,8 @@ class TokenSession(BaseModel):
     created_at: datetime = Field(default_factory=utc_now, description="Session creation time")
     last_refreshed_at: Optional[datetime] = Field(default=None, description="Last token refresh time")
     refresh_count: int = Field(default=0, description="Number of times tokens have been refreshed")
+    refresh_token_version: int = Field(default=0, description="Incremented each time a rotated refresh token is stored")
+    poisoned: bool = Field(default=False, description="Refresh token was rejected; session requires re-authentication")
 
 
 # ==============================================================================
@@ -130,8 +132,8 @@ class CreateSessionRequest(BaseModel):
 
     access_token: str = Field(..., description="Access token from OIDC server")
     refresh_token: str = Field(..., description="Refresh token from OIDC server")
-    expires_in: Optional[int] = Field(None, description="Access token lifetime in seconds (optional, heartbeat handles refresh)", ge=1)
-    refresh_expires_in: Optional[int] = Field(None, description="Refresh token lifetime in seconds (optional, heartbeat handles refresh)", ge=1)
+    expires_in: Optional[int] = Field(None, description="Access token lifetime in seconds (optional, refresh scheduler handles refresh)", ge=1)
+    refresh_expires_in: Optional[int] = Field(None, description="Refresh token lifetime in seconds (optional, refresh scheduler handles refresh)", ge=1)
     scopes: list[str] = Field(default_factory=list, description="List of granted scopes")
     user_id: str = Field(..., description="User identifier (sub claim)")
 
@@ -4,10 +4,14 @@ This module handles:
 - Storing authenticated sessions (access + refresh tokens)
 - Checking token validity before API calls
 - Transparently refreshing tokens using refresh token rotation
+- Scheduling each session's refresh just before its tokens expire
 - Tracking refresh chains for debugging/demo purposes
 """
+import asyncio
+import heapq
 import httpx
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import logging
@@ -17,6 +21,10 @@ from .config import (
     OIDC_CLIENT_ID,
     OIDC_CLIENT_SECRET,
     LOG_TOKEN_EVENTS,
+    TOKEN_REFRESH_BUFFER_SECONDS,
+    TOKEN_REFRESH_HEARTBEAT_SECONDS,
+    TOKEN_REFRESH_RETRY_SECONDS,
+    FORCE_HEARTBEAT_REFRESH,
 )
 from .models import TokenSession
 
@@ -48,6 +56,7 @@ class TokenManager:
     - Stores access and refresh tokens per session
     - Checks token validity before each API call
     - Uses refresh token rotation (gets new refresh token on each refresh)
+    - Refreshes each session on its own deadline via a single scheduler task
     - Tracks refresh chain for debugging
     """
 
@@ -56,6 +65,13 @@ class TokenManager:
         self._sessions: dict[str, TokenSession] = {}
         self._http_client: Optional[httpx.AsyncClient] = None
 
+        # Refresh schedule: min-heap of (monotonic deadline, session_id).
+        # _refresh_deadlines holds the live deadline per session; heap entries
+        # that don't match it (deleted or rescheduled sessions) are skipped.
+        self._refresh_heap: list[tuple[float, str]] = []
+        self._refresh_deadlines: dict[str, float] = {}
+        self._refresh_wakeup = asyncio.Event()
+
     async def _get_http_client(self) -> httpx.AsyncClient:
         """Get or create the HTTP client."""
         if self._http_client is None or self._http_client.is_closed:
@@ -108,6 +124,7 @@ class TokenManager:
         )
 
         self._sessions[session_id] = session
+        self._schedule_refresh(session)
 
         if LOG_TOKEN_EVENTS:
             logger.info(
@@ -126,6 +143,7 @@ class TokenManager:
         """Delete a session (logout)."""
         if session_id in self._sessions:
             del self._sessions[session_id]
+            self._refresh_deadlines.pop(session_id, None)
             if LOG_TOKEN_EVENTS:
                 logger.info(f"[TokenManager] Session deleted: {session_id[:8]}...")
             return True
@@ -144,8 +162,9 @@ class TokenManager:
         """Get the access token for a session.
 
         This method returns the current access token. Token refresh is handled
-        exclusively by the global heartbeat (every 8s), which ensures tokens
-        are always fresh. This eliminates race conditions from concurrent refresh.
+        exclusively by the refresh scheduler, which refreshes each session shortly
+        before its tokens expire. This eliminates race conditions from concurrent
+        refresh.
 
         Args:
             session_id: The session to get the token for
@@ -160,6 +179,11 @@ class TokenManager:
         if not session:
             raise AuthenticationError(f"Session not found: {session_id[:8]}...")
 
+        if session.poisoned:
+            raise AuthenticationError(
+                f"Refresh token for session {session_id[:8]}... was rejected. User must re-authenticate."
+            )
+
         now = utc_now()
 
         # Check if access token is still valid
@@ -172,12 +196,12 @@ class TokenManager:
                 )
             return session.access_token
 
-        # Access token expired - this shouldn't happen if heartbeat is working
+        # Access token expired - this shouldn't happen if the scheduler is working
         # Log a warning and return the token anyway (let the API reject it if needed)
         if LOG_TOKEN_EVENTS:
             logger.warning(
                 f"[TokenManager] Access token expired for session {session_id[:8]}... "
-                f"Heartbeat may not be running frequently enough. "
+                f"Refresh scheduler may not be running. "
                 f"Expired {(now - session.access_token_expires_at).total_seconds():.1f}s ago"
             )
 
@@ -192,6 +216,13 @@ class TokenManager:
         BOTH a new access token AND a new refresh token. We store both,
         extending the session lifetime indefinitely as long as the agent
         remains active.
+
+        The write-back is guarded by a compare-and-swap on
+        ``refresh_token_version``: if another refresh stored new tokens while
+        this request was in flight, our result is stale and is discarded
+        rather than overwriting the newer tokens. The same applies to a
+        failure: a losing request sees the rotated-out token rejected, which
+        must not poison a session the winner has already refreshed.
         
         Args:
             session: The session to refresh
@@ -200,6 +231,7 @@ class TokenManager:
             AuthenticationError: If refresh fails
         """
         client = await self._get_http_client()
+        started_version = session.refresh_token_version
 
         try:
             response = await client.post(
@@ -213,6 +245,17 @@ class TokenManager:
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
             )
 
+            if session.refresh_token_version != started_version:
+                # Another refresh rotated the tokens while this one was in flight.
+                # This response, success or revoked-token error, is stale either way.
+                if LOG_TOKEN_EVENTS:
+                    logger.warning(
+                        f"[TokenManager] Discarding stale refresh for session "
+                        f"{session.session_id[:8]}... (version {started_version} -> "
+                        f"{session.refresh_token_version})"
+                    )
+                return
+
             if response.status_code != 200:
                 error_detail = response.text
                 if LOG_TOKEN_EVENTS:
@@ -220,6 +263,10 @@ class TokenManager:
                         f"[TokenManager] Refresh failed for session {session.session_id[:8]}...: "
                         f"{response.status_code} - {error_detail}"
                     )
+                if response.status_code in (400, 401):
+                    # invalid_grant - the refresh token is revoked or expired, so
+                    # retrying cannot succeed. Mark the session for re-auth.
+                    session.poisoned = True
                 raise AuthenticationError(
                     f"Token refresh failed: {response.status_code}. User may need to re-authenticate."
                 )
@@ -236,10 +283,11 @@ class TokenManager:
             # Store the NEW refresh token (this is the key to rotation)
             if "refresh_token" in token_data:
                 session.refresh_token = token_data["refresh_token"]
-                # Use 30s to match OIDC server config (heartbeat refreshes every 25s)
+                # Use 30s to match OIDC server config
                 # The OIDC server doesn't return refresh_expires_in, so we hardcode it
                 refresh_expires_in = token_data.get("refresh_expires_in", 30)
                 session.refresh_token_expires_at = now + timedelta(seconds=refresh_expires_in)
+                session.refresh_token_version += 1
 
             session.last_refreshed_at = now
             session.refresh_count += 1
@@ -298,61 +346,86 @@ class TokenManager:
         return session.scopes.copy()
 
     # ==========================================================================
-    # Heartbeat Token Refresh
+    # Refresh Scheduling
     # ==========================================================================
 
-    async def refresh_all_sessions(self) -> dict:
-        """Refresh tokens for all active sessions.
+    def _schedule_refresh(self, session: TokenSession, delay: Optional[float] = None) -> None:
+        """Schedule the next refresh for a session.
 
-        This method is called by the global heartbeat to proactively refresh
-        all tokens every 25 seconds, regardless of their current expiration state.
-        This ensures tokens never expire during long-running workflows.
+        By default the refresh is due TOKEN_REFRESH_BUFFER_SECONDS before the
+        earlier of the access and refresh token expiries. With
+        FORCE_HEARTBEAT_REFRESH set, sessions are also refreshed at least every
+        TOKEN_REFRESH_HEARTBEAT_SECONDS to make rotation visible in demos.
 
-        Returns:
-            Dictionary with refresh statistics:
-            - total_sessions: Total number of sessions
-            - refreshed: Number of sessions successfully refreshed
-            - failed: Number of sessions that failed to refresh
-            - errors: List of error messages
+        Args:
+            session: The session to schedule
+            delay: Explicit delay in seconds (e.g. for retries)
         """
-        stats = {
-            "total_sessions": len(self._sessions),
-            "refreshed": 0,
-            "failed": 0,
-            "errors": []
-        }
-
-        now = utc_now()
-
-        for session_id, session in list(self._sessions.items()):
-            try:
-                # Log timing information
-                access_remaining = (session.access_token_expires_at - now).total_seconds()
-                refresh_remaining = (session.refresh_token_expires_at - now).total_seconds()
-
-                if LOG_TOKEN_EVENTS:
-                    logger.info(
-                        f"[TokenManager] Heartbeat refreshing session {session_id[:8]}... "
-                        f"access_remaining={access_remaining:.1f}s, refresh_remaining={refresh_remaining:.1f}s"
-                    )
-
-                # Always refresh - don't check expiration times
-                # The heartbeat runs every 25s which is less than both
-                # access token (10s) and refresh token (30s) lifetimes
-                await self._refresh_tokens(session)
-                stats["refreshed"] += 1
-
-                if LOG_TOKEN_EVENTS:
-                    logger.info(f"[TokenManager] Heartbeat: Session {session_id[:8]}... refreshed successfully")
-
-            except Exception as e:
-                error_msg = f"Session {session_id[:8]}... refresh failed: {str(e)}"
-                if LOG_TOKEN_EVENTS:
-                    logger.error(f"[TokenManager] Heartbeat: {error_msg}")
-                stats["failed"] += 1
-                stats["errors"].append(error_msg)
+        if delay is None:
+            expires_at = min(session.access_token_expires_at, session.refresh_token_expires_at)
+            delay = (expires_at - utc_now()).total_seconds() - TOKEN_REFRESH_BUFFER_SECONDS
+            if FORCE_HEARTBEAT_REFRESH:
+                delay = min(delay, TOKEN_REFRESH_HEARTBEAT_SECONDS)
+
+        # Monotonic deadlines are immune to wall-clock jumps
+        deadline = time.monotonic() + max(0.0, delay)
+        self._refresh_deadlines[session.session_id] = deadline
+        heapq.heappush(self._refresh_heap, (deadline, session.session_id))
+        self._refresh_wakeup.set()
+
+    async def run_refresh_scheduler(self) -> None:
+        """Refresh sessions as their deadlines come due.
+
+        Runs as a single background task for the lifetime of the server. It
+        sleeps until the soonest deadline (or until a new session is scheduled),
+        so wakeups are proportional to actual refreshes rather than a polling
+        interval over every session.
+        """
+        logger.info("[TokenManager] Refresh scheduler started")
 
-        return stats
+        try:
+            while True:
+                if not self._refresh_heap:
+                    await self._refresh_wakeup.wait()
+                    self._refresh_wakeup.clear()
+                    continue
+
+                deadline, session_id = self._refresh_heap[0]
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    # Sleep until due, waking early if an earlier deadline is pushed
+                    self._refresh_wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._refresh_wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(self._refresh_heap)
+                if self._refresh_deadlines.get(session_id) != deadline:
+                    continue  # Stale entry for a deleted or rescheduled session
+                del self._refresh_deadlines[session_id]
+
+                session = self._sessions.get(session_id)
+                if not session or session.poisoned:
+                    continue
+
+                try:
+                    await self._refresh_tokens(session)
+                except Exception as e:
+                    if LOG_TOKEN_EVENTS:
+                        logger.error(f"[TokenManager] Scheduled refresh failed for session {session_id[:8]}...: {e}")
+                    # Poisoned sessions need re-auth; anything else is retried shortly
+                    if not session.poisoned and session_id in self._sessions:
+                        self._schedule_refresh(session, delay=TOKEN_REFRESH_RETRY_SECONDS)
+                    continue
+
+                if session_id in self._sessions:
+                    self._schedule_refresh(session)
+
+        except asyncio.CancelledError:
+            logger.info("[TokenManager] Refresh scheduler stopped")
+            raise
 
     # ==========================================================================
     # Debug/Demo Utilities
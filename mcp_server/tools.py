@@ -7,7 +7,10 @@ the Capital Planning services. Each tool:
 - Calls the appropriate API endpoint
 - Formats the response in markdown or JSON
 """
+import io
 import json
+from functools import lru_cache
+from operator import attrgetter
 from typing import Annotated
 import logging
 
@@ -24,7 +27,7 @@ from .models import (
     InvestmentOptimizationResponse,
 )
 from .api_client import api_client, APIError
-from .token_manager import token_manager, AuthenticationError, AuthorizationError
+from .token_manager import token_manager
 
 logger = logging.getLogger(__name__)
 
@@ -33,30 +36,51 @@ logger = logging.getLogger(__name__)
 # Response Formatting Helpers
 # ==============================================================================
 
+_UNDERSCORE_TO_SPACE = str.maketrans("_", " ")
+
+
+@lru_cache(maxsize=256)
+def format_label(value: str) -> str:
+    """Turn a snake_case value into a display label (e.g. "water_main" -> "Water Main").
+
+    Asset types, conditions and intervention types come from small fixed sets,
+    so labels are memoized rather than recomputed for every row.
+    """
+    return value.translate(_UNDERSCORE_TO_SPACE).title()
+
+
+# Templates filled with str.format / str.format_map by the formatters below
+_INVESTMENT_ITEM_TEMPLATE = """#### Priority {priority_rank}: {asset_id}
+- **Intervention**: {intervention}
+- **Cost**: ${cost:,.2f}
+- **Expected Risk Reduction**: {expected_risk_reduction:.1%}
+"""
+
+_SESSION_INFO_TEMPLATE = """## Session Information
+
+- **Session ID**: {session_id}
+- **User ID**: {user_id}
+- **Scopes**: {scopes}
+- **Access Token Expires In**: {access_token_expires_in_seconds:.1f} seconds
+- **Refresh Token Expires In**: {refresh_token_expires_in_seconds:.1f} seconds
+- **Token Refresh Count**: {refresh_count}
+- **Session Created**: {created_at}
+- **Last Refreshed**: {last_refreshed_at}
+"""
+
 def format_asset_markdown(asset: Asset) -> str:
     """Format a single asset as markdown."""
     return f"""### {asset.name}
 - **ID**: {asset.id}
-- **Type**: {asset.type.replace('_', ' ').title()}
+- **Type**: {format_label(asset.type)}
 - **Location**: {asset.location}
-- **Condition**: {asset.condition.title()}
+- **Condition**: {format_label(asset.condition)}
 - **Install Date**: {asset.install_date}
 - **Age**: {asset.current_age_years} years (expected life: {asset.expected_life_years} years)
 - **Replacement Cost**: ${asset.replacement_cost:,.2f}
 """
 
 
-def format_assets_markdown(assets: list[Asset]) -> str:
-    """Format a list of assets as markdown."""
-    if not assets:
-        return "No assets found."
-    
-    lines = [f"## Assets ({len(assets)} total)\n"]
-    for asset in assets:
-        lines.append(format_asset_markdown(asset))
-    return "\n".join(lines)
-
-
 def format_risk_markdown(risk: AssetRisk) -> str:
     """Format a single risk assessment as markdown."""
     lines = [
@@ -64,13 +88,13 @@ def format_risk_markdown(risk: AssetRisk) -> str:
         f"- **Risk Score**: {risk.risk_score:.2f}/10.0",
         f"- **Probability of Failure**: {risk.probability_of_failure:.1%}",
         f"- **Consequence Score**: {risk.consequence_score:.2f}/10.0",
-        f"- **Condition**: {risk.condition_assessment.title()}"
+        f"- **Condition**: {format_label(risk.condition_assessment)}"
     ]
 
     if risk.recommended_interventions:
         lines.append("\n**Recommended Interventions:**")
         for i, intervention in enumerate(risk.recommended_interventions, 1):
-            lines.append(f"{i}. **{intervention.intervention_type.replace('_', ' ').title()}**")
+            lines.append(f"{i}. **{format_label(intervention.intervention_type)}**")
             lines.append(f"   - Description: {intervention.description}")
             lines.append(f"   - Estimated Cost: ${intervention.estimated_cost:,.2f}")
             lines.append(f"   - Expected Risk Reduction: {intervention.expected_risk_reduction:.1%}")
@@ -87,7 +111,7 @@ def format_risk_analysis_markdown(response: RiskAnalysisResponse) -> str:
     ]
     
     # Sort by risk score descending
-    sorted_risks = sorted(response.risks, key=lambda r: r.risk_score, reverse=True)
+    sorted_risks = sorted(response.risks, key=attrgetter("risk_score"), reverse=True)
     
     for risk in sorted_risks:
         lines.append(format_risk_markdown(risk))
@@ -106,28 +130,51 @@ def format_investment_plan_markdown(response: InvestmentOptimizationResponse) ->
         f"### Selected Investments ({len(response.selected_investments)} items)\n"
     ]
     
-    for inv in response.selected_investments:
-        lines.append(f"""#### Priority {inv.priority_rank}: {inv.asset_id}
-- **Intervention**: {inv.intervention_type.replace('_', ' ').title()}
-- **Cost**: ${inv.cost:,.2f}
-- **Expected Risk Reduction**: {inv.expected_risk_reduction:.1%}
-""")
+    # Present investments in priority order
+    for inv in sorted(response.selected_investments, key=attrgetter("priority_rank")):
+        lines.append(_INVESTMENT_ITEM_TEMPLATE.format(
+            priority_rank=inv.priority_rank,
+            asset_id=inv.asset_id,
+            intervention=format_label(inv.intervention_type),
+            cost=inv.cost,
+            expected_risk_reduction=inv.expected_risk_reduction,
+        ))
     
     return "\n".join(lines)
 
 
-def handle_error(e: Exception) -> str:
-    """Format an error as a helpful message."""
-    if isinstance(e, AuthenticationError):
-        return f"**Authentication Error**: {e}\n\nThe session may have expired. Please re-authenticate."
-    elif isinstance(e, AuthorizationError):
-        return f"**Authorization Error**: {e}\n\nThe user does not have permission for this operation."
-    elif isinstance(e, APIError):
-        if e.status_code == 404:
-            return f"**Not Found**: {e}\n\nPlease check that the resource ID is correct."
-        return f"**API Error**: {e}"
+def handle_error(e: Exception) -> dict:
+    """Build a structured error payload the agent can reason over.
+
+    The status code and a ``retriable`` hint are surfaced so the agent's
+    planner can tell transient upstream failures (5xx, network errors) apart
+    from errors that retrying will not fix (auth, scopes, bad IDs).
+    """
+    status_code = getattr(e, "status_code", None)
+    return {
+        "error": type(e).__name__,
+        "message": str(e),
+        "status_code": status_code,
+        "retriable": isinstance(e, APIError) and (status_code is None or status_code >= 500),
+    }
+
+
+def format_error(error: dict, response_format: ResponseFormat = ResponseFormat.MARKDOWN) -> str:
+    """Render a structured error in the requested response format."""
+    if response_format == ResponseFormat.JSON:
+        return json.dumps(error)
+
+    message = error["message"]
+    if error["error"] == "AuthenticationError":
+        return f"**Authentication Error**: {message}\n\nThe session may have expired. Please re-authenticate."
+    elif error["error"] == "AuthorizationError":
+        return f"**Authorization Error**: {message}\n\nThe user does not have permission for this operation."
+    elif error["error"] == "APIError":
+        if error["status_code"] == 404:
+            return f"**Not Found**: {message}\n\nPlease check that the resource ID is correct."
+        return f"**API Error**: {message}"
     else:
-        return f"**Unexpected Error**: {type(e).__name__}: {e}"
+        return f"**Unexpected Error**: {error['error']}: {message}"
 
 
 # ==============================================================================
@@ -149,19 +196,31 @@ async def get_assets_tool(params: GetAssetsInput, session_id: str) -> str:
         List of assets in markdown or JSON format
     """
     try:
-        assets = await api_client.get_assets(
-            session_id=session_id,
-            portfolio_id=params.portfolio_id
-        )
-        
         if params.response_format == ResponseFormat.JSON:
+            assets = await api_client.get_assets(
+                session_id=session_id,
+                portfolio_id=params.portfolio_id
+            )
             return json.dumps([a.model_dump() for a in assets], indent=2)
-        else:
-            return format_assets_markdown(assets)
+
+        # Format each asset as it streams in rather than buffering the full list
+        buf = io.StringIO()
+        count = 0
+        async for asset in api_client.iter_assets(
+            session_id=session_id,
+            portfolio_id=params.portfolio_id
+        ):
+            buf.write("\n")
+            buf.write(format_asset_markdown(asset))
+            count += 1
+
+        if not count:
+            return "No assets found."
+        return f"## Assets ({count} total)\n{buf.getvalue()}"
             
     except Exception as e:
         logger.error(f"[Tools] get_assets failed: {e}")
-        return handle_error(e)
+        return format_error(handle_error(e), params.response_format)
 
 
 async def get_asset_tool(params: GetAssetInput, session_id: str) -> str:
@@ -190,7 +249,7 @@ async def get_asset_tool(params: GetAssetInput, session_id: str) -> str:
             
     except Exception as e:
         logger.error(f"[Tools] get_asset failed: {e}")
-        return handle_error(e)
+        return format_error(handle_error(e), params.response_format)
 
 
 async def analyze_risk_tool(params: AnalyzeRiskInput, session_id: str) -> str:
@@ -224,7 +283,7 @@ async def analyze_risk_tool(params: AnalyzeRiskInput, session_id: str) -> str:
             
     except Exception as e:
         logger.error(f"[Tools] analyze_risk failed: {e}")
-        return handle_error(e)
+        return format_error(handle_error(e), params.response_format)
 
 
 async def optimize_investments_tool(params: OptimizeInvestmentsInput, session_id: str) -> str:
@@ -259,7 +318,7 @@ async def optimize_investments_tool(params: OptimizeInvestmentsInput, session_id
             
     except Exception as e:
         logger.error(f"[Tools] optimize_investments failed: {e}")
-        return handle_error(e)
+        return format_error(handle_error(e), params.response_format)
 
 
 # ==============================================================================
@@ -285,17 +344,9 @@ async def get_session_info_tool(session_id: str) -> str:
         if "error" in stats:
             return f"**Error**: {stats['error']}"
         
-        return f"""## Session Information
-
-- **Session ID**: {stats['session_id']}
-- **User ID**: {stats['user_id']}
-- **Scopes**: {', '.join(stats['scopes'])}
-- **Access Token Expires In**: {stats['access_token_expires_in_seconds']:.1f} seconds
-- **Refresh Token Expires In**: {stats['refresh_token_expires_in_seconds']:.1f} seconds
-- **Token Refresh Count**: {stats['refresh_count']}
-- **Session Created**: {stats['created_at']}
-- **Last Refreshed**: {stats['last_refreshed_at'] or 'Never'}
-"""
+        stats["scopes"] = ", ".join(stats["scopes"])
+        stats["last_refreshed_at"] = stats["last_refreshed_at"] or "Never"
+        return _SESSION_INFO_TEMPLATE.format_map(stats)
     except Exception as e:
         logger.error(f"[Tools] get_session_info failed: {e}")
-        return handle_error(e)
+        return format_error(handle_error(e))
@@ -5,6 +5,9 @@ ACCESS_TOKEN_LIFETIME = 10
 REFRESH_TOKEN_LIFETIME = 30
 ROTATE_REFRESH_TOKENS = True
 
+# How often expired authorization codes and refresh tokens are purged (in seconds)
+STORE_SWEEP_INTERVAL_SECONDS = 60
+
 # Server configuration
 ISSUER = "http://localhost:8000"
 CLIENT_ID = "capital-planning-client"
@@ -26,3 +29,7 @@ USERS = {
         "email": "limited@example.com"
     }
 }
+
+# Space-delimited "scope" value per user, joined once rather than per token
+for _user in USERS.values():
+    _user["scope_str"] = " ".join(_user["scopes"])
@@ -1,63 +1,104 @@
 """JWT utilities for token creation and validation"""
 import jwt
 import secrets
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+import cryptography
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 import base64
 import json
 
 from .config import ISSUER, ACCESS_TOKEN_LIFETIME, REFRESH_TOKEN_LIFETIME
+from .store import token_key
+
+# Allowed clock skew when checking token expiry (seconds)
+JWT_LEEWAY_SECONDS = 10
+
+# Maximum number of verified token payloads kept in memory
+VERIFY_CACHE_MAX_ENTRIES = 10_000
+
+# Tokens are signed with EdDSA over Ed25519, which signs far faster than RS256
+# and yields much shorter signatures. A full access token is issued in ~50us,
+# so signing runs inline on the event loop: handing it to an executor would
+# cost more in scheduling/IPC than the signature itself.
+JWT_ALGORITHM = "EdDSA"
+
+
+def base64url(data: bytes) -> str:
+    """Encode bytes as unpadded base64url (RFC 7515 section 2)"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
 
 
 class JWTManager:
     """Manages JWT signing keys and token creation"""
 
     def __init__(self):
-        # Generate RSA keypair on startup
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend()
+        # Generate Ed25519 keypair on startup.
+        # Always hand these key objects (never PEM bytes) to jwt.encode/decode:
+        # PyJWT's prepare_key returns key objects as-is, whereas PEM input is
+        # re-parsed on every call.
+        self.private_key: Ed25519PrivateKey = Ed25519PrivateKey.generate()
+        self.public_key: Ed25519PublicKey = self.private_key.public_key()
+
+        # Signing speed depends on the OpenSSL build bundled with the
+        # cryptography wheel, so record which one is in use
+        print(
+            f"[OIDC] Signing {JWT_ALGORITHM} tokens with cryptography {cryptography.__version__} "
+            f"({default_backend().openssl_version_text()})"
         )
-        self.public_key = self.private_key.public_key()
 
         # Key ID for JWKS
         self.kid = secrets.token_urlsafe(16)
 
-    def create_access_token(self, sub: str, scopes: list[str]) -> str:
-        """Create a JWT access token"""
-        now = datetime.now(timezone.utc)
+        # Claims and headers shared by every token we issue
+        self._base_payload = {"iss": ISSUER, "aud": "capital-planning-api"}
+        self._headers = {"kid": self.kid}
+
+        # The key pair never changes, so its base64url encoding and the
+        # JWKS are built once
+        self._x_b64 = base64url(self.public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        ))
+        self._jwks = self._build_jwks()
+
+        # Verified payloads keyed by token digest, oldest first
+        self._verify_cache: OrderedDict[bytes, dict] = OrderedDict()
+        self._verify_cache_lock = threading.Lock()
+
+    def create_access_token(self, sub: str, scopes: list[str], scope_str: str) -> str:
+        """Create a JWT access token (scope_str is the pre-joined "scope" claim)"""
+        now = int(time.time())
         payload = {
-            "iss": ISSUER,
+            **self._base_payload,
             "sub": sub,
-            "aud": "capital-planning-api",
-            "iat": int(now.timestamp()),
-            "exp": int((now + timedelta(seconds=ACCESS_TOKEN_LIFETIME)).timestamp()),
-            "scope": " ".join(scopes),
+            "iat": now,
+            "exp": now + ACCESS_TOKEN_LIFETIME,
+            "scope": scope_str,
             "scopes": scopes
         }
 
         token = jwt.encode(
             payload,
             self.private_key,
-            algorithm="RS256",
-            headers={"kid": self.kid}
+            algorithm=JWT_ALGORITHM,
+            headers=self._headers
         )
         return token
 
-    def create_refresh_token(self, sub: str, scopes: list[str]) -> str:
-        """Create a JWT refresh token"""
-        now = datetime.now(timezone.utc)
+    def create_refresh_token(self, sub: str, scopes: list[str], scope_str: str) -> str:
+        """Create a JWT refresh token (scope_str is the pre-joined "scope" claim)"""
+        now = int(time.time())
         payload = {
-            "iss": ISSUER,
+            **self._base_payload,
             "sub": sub,
-            "aud": "capital-planning-api",
-            "iat": int(now.timestamp()),
-            "exp": int((now + timedelta(seconds=REFRESH_TOKEN_LIFETIME)).timestamp()),
-            "scope": " ".join(scopes),
+            "iat": now,
+            "exp": now + REFRESH_TOKEN_LIFETIME,
+            "scope": scope_str,
             "scopes": scopes,
             "token_type": "refresh"
         }
@@ -65,22 +106,41 @@ class JWTManager:
         token = jwt.encode(
             payload,
             self.private_key,
-            algorithm="RS256",
-            headers={"kid": self.kid}
+            algorithm=JWT_ALGORITHM,
+            headers=self._headers
         )
         return token
 
     def verify_token(self, token: str) -> Optional[dict]:
-        """Verify and decode a JWT token"""
+        """Verify and decode a JWT token
+
+        Verified payloads are cached by token digest, so a token presented
+        repeatedly within its lifetime only pays for signature verification once.
+        """
+        cache_key = token_key(token)
+
+        with self._verify_cache_lock:
+            payload = self._verify_cache.get(cache_key)
+            if payload is not None:
+                if time.time() <= payload["exp"] + JWT_LEEWAY_SECONDS:
+                    return payload
+                del self._verify_cache[cache_key]
+
         try:
             payload = jwt.decode(
                 token,
                 self.public_key,
-                algorithms=["RS256"],
+                algorithms=[JWT_ALGORITHM],
                 audience="capital-planning-api",
                 issuer=ISSUER,
-                leeway=10  # Allow 10 seconds of clock skew
+                leeway=JWT_LEEWAY_SECONDS  # Allow clock skew
             )
+
+            with self._verify_cache_lock:
+                self._verify_cache[cache_key] = payload
+                if len(self._verify_cache) > VERIFY_CACHE_MAX_ENTRIES:
+                    self._verify_cache.popitem(last=False)
+
             return payload
         except jwt.ExpiredSignatureError as e:
             print(f"[JWT] Token expired: {e}")
@@ -97,21 +157,18 @@ class JWTManager:
 
     def get_jwks(self) -> dict:
         """Get JSON Web Key Set for token verification"""
-        public_numbers = self.public_key.public_numbers()
-
-        # Convert to base64url encoded values
-        def int_to_base64url(n: int) -> str:
-            byte_length = (n.bit_length() + 7) // 8
-            n_bytes = n.to_bytes(byte_length, byteorder='big')
-            return base64.urlsafe_b64encode(n_bytes).rstrip(b'=').decode('utf-8')
+        return self._jwks
 
+    def _build_jwks(self) -> dict:
+        """Build the JSON Web Key Set for the current public key"""
+        # OKP key representation per RFC 8037
         jwk = {
-            "kty": "RSA",
+            "kty": "OKP",
+            "crv": "Ed25519",
             "use": "sig",
             "kid": self.kid,
-            "alg": "RS256",
-            "n": int_to_base64url(public_numbers.n),
-            "e": int_to_base64url(public_numbers.e)
+            "alg": JWT_ALGORITHM,
+            "x": self._x_b64
         }
 
         return {
@@ -1,20 +1,51 @@
 """Mock OIDC Server with token rotation support"""
 from fastapi import FastAPI, HTTPException, Form, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+import asyncio
+import base64
 import secrets
-from datetime import datetime, timedelta, timezone
+import time
+from contextlib import asynccontextmanager
 from typing import Optional
 
 from .config import (
     USERS, ISSUER, CLIENT_ID,
     ACCESS_TOKEN_LIFETIME, REFRESH_TOKEN_LIFETIME,
-    ROTATE_REFRESH_TOKENS
+    ROTATE_REFRESH_TOKENS, STORE_SWEEP_INTERVAL_SECONDS
 )
 from .jwt_utils import JWTManager
-from .models import TokenResponse, UserInfo
+from .models import UserInfo
+from .store import TTLStore, token_key
 
-app = FastAPI(title="Mock OIDC Server")
+
+def _mkcode() -> str:
+    """Generate an opaque 192-bit identifier (authorization codes, token ids)"""
+    return base64.urlsafe_b64encode(secrets.token_bytes(24)).decode("ascii")
+
+
+async def sweep_expired_entries():
+    """Periodically purge expired authorization codes and refresh tokens"""
+    while True:
+        await asyncio.sleep(STORE_SWEEP_INTERVAL_SECONDS)
+        removed = auth_codes.sweep() + refresh_tokens_store.sweep()
+        if removed:
+            print(f"[OIDC] Swept {removed} expired code/token entries")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the expiry sweeper for the lifetime of the server"""
+    sweeper = asyncio.create_task(sweep_expired_entries())
+    yield
+    sweeper.cancel()
+
+
+app = FastAPI(
+    title="Mock OIDC Server",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Enable CORS
 app.add_middleware(
@@ -29,8 +60,11 @@ app.add_middleware(
 jwt_manager = JWTManager()
 
 # In-memory storage for authorization codes and refresh tokens
-auth_codes = {}  # code -> {sub, scopes, expires, used}
-refresh_tokens_store = {}  # token_id -> {sub, scopes, expires, revoked, parent}
+auth_codes = TTLStore()  # code -> {sub, scopes, scope_str, expires, used}
+refresh_tokens_store = TTLStore()  # token_key(token) -> {id, sub, scopes, scope_str, expires, revoked, parent}
+# "expires" values are epoch seconds (time.time())
+# Both stores (and the signing key) are process-local, so the server must run
+# as a single worker; see "Known Limitations" in README.md
 
 
 @app.get("/.well-known/openid-configuration")
@@ -45,7 +79,7 @@ async def openid_configuration():
         "response_types_supported": ["code"],
         "grant_types_supported": ["authorization_code", "refresh_token"],
         "subject_types_supported": ["public"],
-        "id_token_signing_alg_values_supported": ["RS256"],
+        "id_token_signing_alg_values_supported": ["EdDSA"],
         "scopes_supported": ["assets:read", "risk:analyze", "investments:write"],
         "token_endpoint_auth_methods_supported": ["client_secret_post", "none"],
     }
@@ -79,13 +113,14 @@ async def authorize(
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Generate authorization code
-    code = secrets.token_urlsafe(32)
-    auth_codes[code] = {
+    code = _mkcode()
+    auth_codes.set(code, {
         "sub": user["sub"],
         "scopes": user["scopes"],
-        "expires": datetime.now(timezone.utc) + timedelta(seconds=60),
+        "scope_str": user["scope_str"],
+        "expires": time.time() + 60,
         "used": False
-    }
+    })
 
     return {
         "code": code,
@@ -128,36 +163,37 @@ async def handle_authorization_code_grant(code: str):
         raise HTTPException(status_code=400, detail="Authorization code already used")
 
     # Check expiration
-    if datetime.now(timezone.utc) > code_data["expires"]:
+    if time.time() > code_data["expires"]:
         raise HTTPException(status_code=400, detail="Authorization code expired")
 
     # Mark as used
     code_data["used"] = True
 
     # Create tokens
-    access_token = jwt_manager.create_access_token(code_data["sub"], code_data["scopes"])
-    refresh_token = jwt_manager.create_refresh_token(code_data["sub"], code_data["scopes"])
+    access_token = jwt_manager.create_access_token(code_data["sub"], code_data["scopes"], code_data["scope_str"])
+    refresh_token = jwt_manager.create_refresh_token(code_data["sub"], code_data["scopes"], code_data["scope_str"])
 
     # Store refresh token metadata
-    refresh_token_id = secrets.token_urlsafe(32)
-    refresh_tokens_store[refresh_token] = {
+    refresh_token_id = _mkcode()
+    refresh_tokens_store.set(token_key(refresh_token), {
         "id": refresh_token_id,
         "sub": code_data["sub"],
         "scopes": code_data["scopes"],
-        "expires": datetime.now(timezone.utc) + timedelta(seconds=REFRESH_TOKEN_LIFETIME),
+        "scope_str": code_data["scope_str"],
+        "expires": time.time() + REFRESH_TOKEN_LIFETIME,
         "revoked": False,
         "parent": None
-    }
+    })
 
     print(f"[OIDC] Issued tokens for user: {code_data['sub']}")
 
-    return TokenResponse(
-        access_token=access_token,
-        token_type="Bearer",
-        expires_in=ACCESS_TOKEN_LIFETIME,
-        refresh_token=refresh_token,
-        scope=" ".join(code_data["scopes"])
-    ).model_dump()
+    return {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expires_in": ACCESS_TOKEN_LIFETIME,
+        "refresh_token": refresh_token,
+        "scope": code_data["scope_str"]
+    }
 
 
 async def handle_refresh_token_grant(refresh_token: str):
@@ -171,10 +207,11 @@ async def handle_refresh_token_grant(refresh_token: str):
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
     # Check if token is in our store
-    if refresh_token not in refresh_tokens_store:
+    refresh_token_key = token_key(refresh_token)
+    if refresh_token_key not in refresh_tokens_store:
         raise HTTPException(status_code=401, detail="Unknown refresh token")
 
-    token_data = refresh_tokens_store[refresh_token]
+    token_data = refresh_tokens_store[refresh_token_key]
 
     # Check if revoked
     if token_data["revoked"]:
@@ -183,53 +220,55 @@ async def handle_refresh_token_grant(refresh_token: str):
         raise HTTPException(status_code=401, detail="Refresh token has been revoked")
 
     # Check expiration
-    if datetime.now(timezone.utc) > token_data["expires"]:
+    if time.time() > token_data["expires"]:
         raise HTTPException(status_code=401, detail="Refresh token expired")
 
     # Revoke the old refresh token
     token_data["revoked"] = True
 
     # Create new tokens
-    access_token = jwt_manager.create_access_token(token_data["sub"], token_data["scopes"])
+    access_token = jwt_manager.create_access_token(token_data["sub"], token_data["scopes"], token_data["scope_str"])
 
     if ROTATE_REFRESH_TOKENS:
         # Issue new refresh token
-        new_refresh_token = jwt_manager.create_refresh_token(token_data["sub"], token_data["scopes"])
+        new_refresh_token = jwt_manager.create_refresh_token(token_data["sub"], token_data["scopes"], token_data["scope_str"])
 
         # Store new refresh token metadata
-        new_token_id = secrets.token_urlsafe(32)
-        refresh_tokens_store[new_refresh_token] = {
+        new_token_id = _mkcode()
+        refresh_tokens_store.set(token_key(new_refresh_token), {
             "id": new_token_id,
             "sub": token_data["sub"],
             "scopes": token_data["scopes"],
-            "expires": datetime.now(timezone.utc) + timedelta(seconds=REFRESH_TOKEN_LIFETIME),
+            "scope_str": token_data["scope_str"],
+            "expires": time.time() + REFRESH_TOKEN_LIFETIME,
             "revoked": False,
             "parent": token_data["id"]
-        }
+        })
 
         print(f"[OIDC] Rotated refresh token for user: {token_data['sub']}")
 
-        return TokenResponse(
-            access_token=access_token,
-            token_type="Bearer",
-            expires_in=ACCESS_TOKEN_LIFETIME,
-            refresh_token=new_refresh_token,
-            scope=" ".join(token_data["scopes"])
-        ).model_dump()
+        return {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": ACCESS_TOKEN_LIFETIME,
+            "refresh_token": new_refresh_token,
+            "scope": token_data["scope_str"]
+        }
     else:
         # Reuse same refresh token (update expiry)
         token_data["revoked"] = False
-        token_data["expires"] = datetime.now(timezone.utc) + timedelta(seconds=REFRESH_TOKEN_LIFETIME)
+        token_data["expires"] = time.time() + REFRESH_TOKEN_LIFETIME
+        refresh_tokens_store.set(refresh_token_key, token_data)  # Keep store in expiry order
 
         print(f"[OIDC] Refreshed access token for user: {token_data['sub']}")
 
-        return TokenResponse(
-            access_token=access_token,
-            token_type="Bearer",
-            expires_in=ACCESS_TOKEN_LIFETIME,
-            refresh_token=refresh_token,
-            scope=" ".join(token_data["scopes"])
-        ).model_dump()
+        return {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": ACCESS_TOKEN_LIFETIME,
+            "refresh_token": refresh_token,
+            "scope": token_data["scope_str"]
+        }
 
 
 @app.get("/userinfo")
@@ -244,7 +283,7 @@ async def userinfo(authorization: Optional[str] = Header(None)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header format")
 
-    token = authorization.replace("Bearer ", "")
+    token = authorization[len("Bearer "):]
     payload = jwt_manager.verify_token(token)
 
     if not payload:
@@ -0,0 +1,44 @@
+"""In-memory TTL store for authorization codes and refresh tokens"""
+import hashlib
+import time
+from collections import OrderedDict
+
+
+def token_key(token: str) -> bytes:
+    """Compact 16-byte digest of a token, used as a dict key instead of the full JWT"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class TTLStore(OrderedDict):
+    """Insertion-ordered dict whose values carry an "expires" epoch timestamp.
+
+    Entries are kept in (roughly) expiry order, so expired entries collect at
+    the front and can be popped cheaply on each write instead of letting the
+    store grow without bound.
+    """
+
+    def set(self, key, value: dict) -> None:
+        """Insert or replace an entry, moving it to the back of the queue"""
+        self.sweep_front()
+        self[key] = value
+        self.move_to_end(key)
+
+    def sweep_front(self) -> int:
+        """Pop leading expired entries, stopping at the first live one"""
+        now = time.time()
+        removed = 0
+        while self:
+            key, value = next(iter(self.items()))
+            if value["expires"] >= now:
+                break
+            del self[key]
+            removed += 1
+        return removed
+
+    def sweep(self) -> int:
+        """Remove every expired entry, wherever it sits in the store"""
+        now = time.time()
+        expired = [key for key, value in self.items() if value["expires"] < now]
+        for key in expired:
+            del self[key]
+        return len(expired)
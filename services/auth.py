@@ -3,43 +3,144 @@ from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 import httpx
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
 from typing import Optional
 from functools import lru_cache
 
-from .config import JWKS_URL
+from .config import (
+    JWKS_URL, JWKS_REFRESH_INTERVAL, JWKS_RETRY_INITIAL_DELAY,
+    JWKS_MIN_REFRESH_INTERVAL
+)
+
+logger = logging.getLogger("services.auth")
 
 security = HTTPBearer()
 
-# Cache for JWKS
-_jwks_cache = None
+# Maximum number of verified token payloads kept in memory
+VERIFY_CACHE_MAX_ENTRIES = 10_000
+
+# Public keys from the JWKS, parsed once per fetch and indexed by kid
+_jwks_index: dict[str, jwt.PyJWK] = {}
+
+# Shared HTTP client for OIDC server calls (keeps the connection alive between fetches)
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Serializes on-demand JWKS fetches; _last_jwks_fetch is a time.monotonic() value
+_jwks_refresh_lock = asyncio.Lock()
+_last_jwks_fetch = 0.0
 
+# Verified payloads keyed by token digest, oldest first
+_verify_cache: OrderedDict[bytes, dict] = OrderedDict()
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
+    return _http_client
 
-async def get_jwks():
-    """Fetch JWKS from OIDC server (cached)"""
-    global _jwks_cache
 
-    if _jwks_cache is None:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(JWKS_URL)
-            response.raise_for_status()
-            _jwks_cache = response.json()
+async def close_http_client():
+    """Close the shared HTTP client"""
+    if _http_client and not _http_client.is_closed:
+        await _http_client.aclose()
 
-    return _jwks_cache
 
+async def fetch_jwks() -> None:
+    """Fetch JWKS from OIDC server and rebuild the kid -> public key index"""
+    global _jwks_index, _last_jwks_fetch
 
-def get_public_key_from_jwks(jwks: dict, kid: str):
-    """Extract public key from JWKS"""
+    _last_jwks_fetch = time.monotonic()
+    response = await _get_http_client().get(JWKS_URL)
+    response.raise_for_status()
+    jwks = response.json()
+
+    # Parse each JWK once (handles any key type, e.g. RSA or OKP); the parsed
+    # key also carries the algorithm tokens signed with it must use.
+    # A malformed key is skipped rather than discarding the rest of the set.
+    index = {}
     for key in jwks.get("keys", []):
-        if key.get("kid") == kid:
-            # Convert JWK to PEM
-            from jwt.algorithms import RSAAlgorithm
-            return RSAAlgorithm.from_jwk(key)
-    return None
+        if "kid" not in key:
+            continue
+        try:
+            index[key["kid"]] = jwt.PyJWK(key)
+        except jwt.PyJWTError as e:
+            logger.warning("Skipping unusable JWKS key %r: %s", key["kid"], e)
+    _jwks_index = index
+
+
+async def refresh_if_unknown_kid(kid: str) -> None:
+    """
+    Re-fetch the JWKS when a token names a kid we don't know (e.g. key rotation).
+
+    Concurrent callers share a single fetch: they queue on the lock and
+    re-check the index once it is released. Fetches, including failed ones,
+    are limited to one per JWKS_MIN_REFRESH_INTERVAL, so neither tokens with
+    bogus kids nor requests queued behind a fetch from an unreachable OIDC
+    server can flood it with retries.
+    """
+    if kid in _jwks_index:
+        return
+
+    async with _jwks_refresh_lock:
+        if kid in _jwks_index:
+            return
+        if time.monotonic() - _last_jwks_fetch < JWKS_MIN_REFRESH_INTERVAL:
+            return
+
+        await fetch_jwks()
+
+
+async def refresh_jwks_periodically():
+    """
+    Prefetch the JWKS at startup and re-fetch it every JWKS_REFRESH_INTERVAL.
+
+    A failed fetch keeps the current keys and is retried with exponential
+    backoff, so request handlers only ever read the in-process cache.
+    """
+    retry_delay = JWKS_RETRY_INITIAL_DELAY
+    while True:
+        try:
+            await fetch_jwks()
+        except (httpx.HTTPError, jwt.PyJWTError, ValueError) as e:
+            # ValueError covers a response body that isn't JSON; any failure
+            # must leave this task alive to try again
+            logger.warning("JWKS fetch failed, retrying in %ss: %s", retry_delay, e)
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, JWKS_REFRESH_INTERVAL)
+            continue
+
+        retry_delay = JWKS_RETRY_INITIAL_DELAY
+        await asyncio.sleep(JWKS_REFRESH_INTERVAL)
+
+
+def _token_key(token: str) -> bytes:
+    """Compact 16-byte digest of a token, used as the verify cache key"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
-    """Verify JWT token and return payload"""
+    """Verify JWT token and return payload
+
+    Verified payloads are cached by token digest until the token expires, so
+    the agent's repeated calls with the same token skip signature verification.
+    """
     token = credentials.credentials
+    cache_key = _token_key(token)
+
+    payload = _verify_cache.get(cache_key)
+    if payload is not None:
+        if time.time() < payload["exp"]:
+            return payload
+        del _verify_cache[cache_key]
 
     try:
         # Decode header to get kid
@@ -49,22 +150,38 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
         if not kid:
             raise HTTPException(status_code=401, detail="Missing kid in token header")
 
-        # Get JWKS and extract public key
-        jwks = await get_jwks()
-        public_key = get_public_key_from_jwks(jwks, kid)
-
-        if not public_key:
+        # Look up the pre-parsed public key
+        jwk = _jwks_index.get(kid)
+        if jwk is None:
+            # Startup prefetch hasn't landed yet, or the signing key rotated
+            try:
+                await refresh_if_unknown_kid(kid)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("On-demand JWKS fetch failed: %s", e)
+                raise HTTPException(status_code=503, detail="Signing keys are unavailable")
+            jwk = _jwks_index.get(kid)
+
+        if jwk is None and not _jwks_index:
+            # No keys loaded and a fetch was just attempted; don't blame the token
+            raise HTTPException(status_code=503, detail="Signing keys are unavailable")
+        if jwk is None:
             raise HTTPException(status_code=401, detail="Public key not found for kid")
 
-        # Verify and decode token
+        # Verify and decode token with the algorithm bound to the matching key,
+        # so EdDSA (built-in OIDC server) and RS256 (e.g. Okta) both work
         payload = jwt.decode(
             token,
-            public_key,
-            algorithms=["RS256"],
+            jwk.key,
+            algorithms=[jwk.algorithm_name],
             audience="capital-planning-api",
-            options={"verify_exp": True}
+            # exp is required so cached payloads can always be expiry-checked
+            options={"verify_exp": True, "require": ["exp"]}
         )
 
+        _verify_cache[cache_key] = payload
+        if len(_verify_cache) > VERIFY_CACHE_MAX_ENTRIES:
+            _verify_cache.popitem(last=False)
+
         return payload
 
     except jwt.ExpiredSignatureError:
@@ -73,8 +190,13 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
 
+@lru_cache(maxsize=32)
 def require_scope(required_scope: str):
-    """Dependency to require a specific scope"""
+    """Dependency to require a specific scope
+
+    Memoized so every route requiring the same scope shares one checker,
+    which FastAPI then resolves as a single dependency.
+    """
     async def scope_checker(token_payload: dict = Depends(verify_token)) -> dict:
         scopes = token_payload.get("scopes", [])
 
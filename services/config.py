@@ -1,9 +1,26 @@
 """Service Configuration"""
+import os
+
+# Log level for the services logger; per-request logs are INFO, so set
+# SERVICES_LOG_LEVEL=WARNING to silence them under load
+LOG_LEVEL = os.getenv("SERVICES_LOG_LEVEL", "INFO").upper()
 
 # OIDC configuration
 OIDC_SERVER_URL = "http://localhost:8000"
 JWKS_URL = f"{OIDC_SERVER_URL}/jwks"
 
+# JWKS refresh schedule (in seconds): normal refresh period, and the first
+# retry delay after a failed fetch (doubled on each further failure)
+JWKS_REFRESH_INTERVAL = 900
+JWKS_RETRY_INITIAL_DELAY = 1
+
+# Minimum time between on-demand JWKS fetches triggered by an unknown kid
+JWKS_MIN_REFRESH_INTERVAL = 10
+
+# Artificial delays are on by default to push operations past the access
+# token lifetime; set SIMULATE_DELAYS=false to skip them (e.g. benchmarking)
+SIMULATE_DELAYS = os.getenv("SIMULATE_DELAYS", "true").lower() == "true"
+
 # Artificial delays for endpoints (in seconds)
 ENDPOINT_DELAYS = {
     "get_assets": 2,
@@ -12,6 +29,13 @@ ENDPOINT_DELAYS = {
     "optimize_investments": 8  # Longer than access token lifetime!
 }
 
+# Maximum number of requests allowed to sit in the artificial delay at once;
+# further requests get a 503 instead of piling up
+MAX_CONCURRENT_DELAYED = {
+    "analyze_risk": 64,
+    "optimize_investments": 32
+}
+
 # Scope requirements
 SCOPE_REQUIREMENTS = {
     "assets:read": ["GET /assets", "GET /assets/{assetId}"],
@@ -1,22 +1,72 @@
 """FastAPI Mock Services for Capital Planning"""
 from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 import asyncio
+import itertools
+import logging
 import secrets
+from contextlib import asynccontextmanager
 from typing import Optional
 
-from .config import ENDPOINT_DELAYS
+from .config import ENDPOINT_DELAYS, SIMULATE_DELAYS, MAX_CONCURRENT_DELAYED, LOG_LEVEL
 from .models import (
-    Asset, RiskAnalysisRequest, RiskAnalysisResponse, AssetRisk,
-    InvestmentOptimizationRequest, InvestmentOptimizationResponse, SelectedInvestment
+    Asset, RiskAnalysisRequest, RiskAnalysisResponse,
+    InvestmentOptimizationRequest, InvestmentOptimizationResponse
 )
 from .mock_data import (
     get_assets_by_portfolio, get_asset_by_id,
-    calculate_mock_risk, optimize_mock_investments
+    get_assets_json_by_portfolio, get_assets_ndjson_by_portfolio, get_asset_json_by_id,
+    calculate_mock_risk_batch, optimize_mock_investments
 )
-from .auth import verify_token, require_scope
+from .auth import verify_token, require_scope, refresh_jwks_periodically, close_http_client
 
-app = FastAPI(title="Capital Planning Services")
+logger = logging.getLogger("services")
+
+
+# Analysis/plan IDs are correlation IDs, not secrets: a per-process nonce plus
+# a counter keeps them unique without a urandom call per request
+_ID_NONCE = secrets.token_hex(4)
+_id_counter = itertools.count(1)
+
+
+def _next_id(prefix: str) -> str:
+    """Generate a unique ID, e.g. risk-analysis-1a2b3c4d-0000002a"""
+    return f"{prefix}-{_ID_NONCE}-{next(_id_counter):08x}"
+
+
+# Caps on requests waiting out the artificial delay, per endpoint
+_delay_slots = {
+    endpoint: asyncio.Semaphore(limit)
+    for endpoint, limit in MAX_CONCURRENT_DELAYED.items()
+}
+
+
+async def simulate_delay(endpoint: str, description: str):
+    """Sleep for the endpoint's artificial delay, rejecting with 503 when at capacity"""
+    slots = _delay_slots[endpoint]
+    if slots.locked():
+        raise HTTPException(status_code=503, detail=f"Too many {description}s in progress, retry shortly")
+
+    async with slots:
+        logger.info("Simulating %s delay of %ss...", description, ENDPOINT_DELAYS[endpoint])
+        await asyncio.sleep(ENDPOINT_DELAYS[endpoint])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Keep the OIDC signing keys loaded for the lifetime of the server"""
+    jwks_refresher = asyncio.create_task(refresh_jwks_periodically())
+    yield
+    jwks_refresher.cancel()
+    await close_http_client()
+
+
+app = FastAPI(
+    title="Capital Planning Services",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Enable CORS
 app.add_middleware(
@@ -44,15 +94,37 @@ async def get_assets(
     token_payload: dict = Depends(require_scope("assets:read"))
 ):
     """Get all assets in a portfolio"""
-    print(f"[Services] GET /assets - User: {token_payload.get('sub')}")
+    logger.info("GET /assets - User: %s", token_payload.get("sub"))
+
+    # Artificial delay
+    if SIMULATE_DELAYS:
+        await asyncio.sleep(ENDPOINT_DELAYS["get_assets"])
+
+    assets = get_assets_by_portfolio(portfolio_id)
+    logger.info("Returning %d assets", len(assets))
+
+    # Serve the pre-serialized JSON rather than re-encoding every asset
+    return Response(content=get_assets_json_by_portfolio(portfolio_id), media_type="application/json")
+
+
+@app.get("/assets/stream")
+async def stream_assets(
+    portfolio_id: str = Query(default="default"),
+    token_payload: dict = Depends(require_scope("assets:read"))
+):
+    """Stream all assets in a portfolio as newline-delimited JSON"""
+    logger.info("GET /assets/stream - User: %s", token_payload.get("sub"))
 
     # Artificial delay
-    await asyncio.sleep(ENDPOINT_DELAYS["get_assets"])
+    if SIMULATE_DELAYS:
+        await asyncio.sleep(ENDPOINT_DELAYS["get_assets"])
 
     assets = get_assets_by_portfolio(portfolio_id)
-    print(f"[Services] Returning {len(assets)} assets")
+    logger.info("Streaming %d assets", len(assets))
 
-    return assets
+    # The NDJSON body is pre-built, so it goes out in one write rather than
+    # one threadpool round-trip per line through a sync iterator
+    return Response(content=get_assets_ndjson_by_portfolio(portfolio_id), media_type="application/x-ndjson")
 
 
 @app.get("/assets/{asset_id}", response_model=Asset)
@@ -61,16 +133,19 @@ async def get_asset(
     token_payload: dict = Depends(require_scope("assets:read"))
 ):
     """Get a single asset by ID"""
-    print(f"[Services] GET /assets/{asset_id} - User: {token_payload.get('sub')}")
-
-    # Artificial delay
-    await asyncio.sleep(ENDPOINT_DELAYS["get_asset"])
+    logger.info("GET /assets/%s - User: %s", asset_id, token_payload.get("sub"))
 
-    asset = get_asset_by_id(asset_id)
-    if not asset:
+    # Unknown IDs are rejected up front, so probing for IDs costs a dict miss
+    # rather than an artificial delay per request
+    asset_json = get_asset_json_by_id(asset_id)
+    if not asset_json:
         raise HTTPException(status_code=404, detail=f"Asset {asset_id} not found")
 
-    return asset
+    # Artificial delay
+    if SIMULATE_DELAYS:
+        await asyncio.sleep(ENDPOINT_DELAYS["get_asset"])
+
+    return Response(content=asset_json, media_type="application/json")
 
 
 # ============================================================================
@@ -83,36 +158,35 @@ async def analyze_risk(
     token_payload: dict = Depends(require_scope("risk:analyze"))
 ):
     """Analyze risk for given assets"""
-    print(f"[Services] POST /risk/analyze - User: {token_payload.get('sub')}")
-    print(f"[Services] Analyzing {len(request.asset_ids)} assets over {request.horizon_months} months")
+    logger.info("POST /risk/analyze - User: %s", token_payload.get("sub"))
+    logger.info("Analyzing %d assets over %d months", len(request.asset_ids), request.horizon_months)
 
     # Artificial delay (longer than access token lifetime!)
-    print(f"[Services] Simulating analysis delay of {ENDPOINT_DELAYS['analyze_risk']}s...")
-    await asyncio.sleep(ENDPOINT_DELAYS["analyze_risk"])
-
-    # Calculate risk for each asset
-    risks = []
-    for asset_id in request.asset_ids:
-        asset = get_asset_by_id(asset_id)
-        if asset:
-            risk_data = calculate_mock_risk(asset, request.horizon_months)
-            # Extract interventions separately since they're in the risk_data dict
-            interventions = risk_data.pop("recommended_interventions", [])
-            risks.append(AssetRisk(
-                asset_id=asset_id,
-                recommended_interventions=interventions,
-                **risk_data
-            ))
-
-    analysis_id = f"risk-analysis-{secrets.token_urlsafe(8)}"
-
-    print(f"[Services] Risk analysis complete: {analysis_id}")
-
-    return RiskAnalysisResponse(
-        analysis_id=analysis_id,
-        horizon_months=request.horizon_months,
-        risks=risks
-    )
+    if SIMULATE_DELAYS:
+        await simulate_delay("analyze_risk", "analysis")
+
+    # Calculate risk for each distinct known asset in one batch
+    unique_ids = dict.fromkeys(request.asset_ids)
+    assets = [asset for asset in map(get_asset_by_id, unique_ids) if asset]
+    risks_by_id = {
+        asset.id: {"asset_id": asset.id, **risk_data}
+        for asset, risk_data in zip(assets, calculate_mock_risk_batch(assets, request.horizon_months))
+    }
+
+    # Repeated IDs in the request share the same result
+    risks = [risks_by_id[asset_id] for asset_id in request.asset_ids if asset_id in risks_by_id]
+
+    analysis_id = _next_id("risk-analysis")
+
+    logger.info("Risk analysis complete: %s", analysis_id)
+
+    # The data is computed server-side, so it is returned as plain dicts without
+    # re-validating it through the response models (which still document the schema)
+    return ORJSONResponse({
+        "analysis_id": analysis_id,
+        "horizon_months": request.horizon_months,
+        "risks": risks
+    })
 
 
 # ============================================================================
@@ -125,12 +199,12 @@ async def optimize_investments(
     token_payload: dict = Depends(require_scope("investments:write"))
 ):
     """Optimize investment plan"""
-    print(f"[Services] POST /investments/optimize - User: {token_payload.get('sub')}")
-    print(f"[Services] Optimizing {len(request.candidates)} candidates with budget ${request.budget:,.2f}")
+    logger.info("POST /investments/optimize - User: %s", token_payload.get("sub"))
+    logger.info("Optimizing %d candidates with budget $%.2f", len(request.candidates), request.budget)
 
     # Artificial delay (longer than access token lifetime!)
-    print(f"[Services] Simulating optimization delay of {ENDPOINT_DELAYS['optimize_investments']}s...")
-    await asyncio.sleep(ENDPOINT_DELAYS["optimize_investments"])
+    if SIMULATE_DELAYS:
+        await simulate_delay("optimize_investments", "optimization")
 
     # Run optimization
     result = optimize_mock_investments(
@@ -139,22 +213,29 @@ async def optimize_investments(
         request.horizon_months
     )
 
-    plan_id = f"investment-plan-{secrets.token_urlsafe(8)}"
+    plan_id = _next_id("investment-plan")
 
-    print(f"[Services] Optimization complete: {plan_id}")
-    print(f"[Services] Selected {len(result['selected_investments'])} investments, using ${result['budget_used']:,.2f}")
-
-    return InvestmentOptimizationResponse(
-        plan_id=plan_id,
-        total_budget=request.budget,
-        budget_used=result["budget_used"],
-        budget_remaining=result["budget_remaining"],
-        selected_investments=[SelectedInvestment(**inv) for inv in result["selected_investments"]],
-        total_risk_reduction=result["total_risk_reduction"]
+    logger.info("Optimization complete: %s", plan_id)
+    logger.info(
+        "Selected %d investments, using $%.2f",
+        len(result["selected_investments"]), result["budget_used"]
     )
 
+    return ORJSONResponse({
+        "plan_id": plan_id,
+        "total_budget": request.budget,
+        "budget_used": result["budget_used"],
+        "budget_remaining": result["budget_remaining"],
+        "selected_investments": result["selected_investments"],
+        "total_risk_reduction": result["total_risk_reduction"]
+    })
+
 
 if __name__ == "__main__":
     import uvicorn
-    print("[Services] Starting Capital Planning Services on port 8001")
+    logging.basicConfig(level=LOG_LEVEL, format="[Services] %(message)s")
+    logger.info("Starting Capital Planning Services on port 8001")
+    # uvicorn[standard] already selects httptools (and uvloop, where supported)
+    # via its "auto" defaults. Keep a single worker: the mock assets are
+    # randomly generated per process, so workers would disagree on the data.
     uvicorn.run(app, host="0.0.0.0", port=8001)
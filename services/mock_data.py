@@ -1,6 +1,7 @@
 """Mock data for services"""
 import random
 from datetime import datetime, timedelta
+from typing import NamedTuple
 from .models import Asset
 
 # Generate mock assets
@@ -60,6 +61,14 @@ for i in range(1, 31):
     )
     MOCK_ASSETS.append(asset)
 
+# Index for constant-time lookup by ID
+MOCK_ASSETS_BY_ID = {asset.id: asset for asset in MOCK_ASSETS}
+
+# Mock assets never change, so their JSON encodings are built once
+MOCK_ASSET_JSON_BY_ID = {asset.id: asset.model_dump_json().encode() for asset in MOCK_ASSETS}
+MOCK_ASSETS_JSON = b"[" + b",".join(MOCK_ASSET_JSON_BY_ID.values()) + b"]"
+MOCK_ASSETS_NDJSON = b"".join(line + b"\n" for line in MOCK_ASSET_JSON_BY_ID.values())
+
 
 def get_assets_by_portfolio(portfolio_id: str = "default") -> list[Asset]:
     """Get all assets for a portfolio"""
@@ -68,105 +77,128 @@ def get_assets_by_portfolio(portfolio_id: str = "default") -> list[Asset]:
 
 def get_asset_by_id(asset_id: str) -> Asset:
     """Get a single asset by ID"""
-    for asset in MOCK_ASSETS:
-        if asset.id == asset_id:
-            return asset
-    return None
+    return MOCK_ASSETS_BY_ID.get(asset_id)
 
 
-def generate_intervention_options(asset: Asset, probability_of_failure: float) -> list[dict]:
-    """Generate intervention options based on asset condition and risk.
+def get_assets_json_by_portfolio(portfolio_id: str = "default") -> bytes:
+    """Get all assets for a portfolio as pre-serialized JSON"""
+    return MOCK_ASSETS_JSON
 
-    Returns a list of intervention options with costs and expected risk reductions.
-    The options are tailored to the asset's condition and type.
-    """
-    interventions = []
 
-    # Base costs for different intervention types
-    replacement_cost = asset.replacement_cost
+def get_assets_ndjson_by_portfolio(portfolio_id: str = "default") -> bytes:
+    """Get all assets for a portfolio as pre-serialized newline-delimited JSON"""
+    return MOCK_ASSETS_NDJSON
 
-    # REPLACE - Complete replacement (highest cost, highest risk reduction)
-    # Available for all conditions, especially critical/poor
-    if asset.condition in ["critical", "poor", "fair"]:
-        interventions.append({
-            "intervention_type": "replace",
-            "description": f"Complete replacement of {asset.name}",
-            "estimated_cost": round(replacement_cost, 2),
-            "expected_risk_reduction": round(min(0.95, probability_of_failure * 0.98), 4)
-        })
 
-    # REHABILITATE - Major overhaul (medium-high cost, good risk reduction)
-    # Available for poor/fair condition
-    if asset.condition in ["poor", "fair"]:
-        rehab_cost = replacement_cost * random.uniform(0.55, 0.70)
-        interventions.append({
-            "intervention_type": "rehabilitate",
-            "description": f"Major rehabilitation and system upgrade",
-            "estimated_cost": round(rehab_cost, 2),
-            "expected_risk_reduction": round(min(0.80, probability_of_failure * 0.85), 4)
-        })
+def get_asset_json_by_id(asset_id: str) -> bytes | None:
+    """Get a single asset by ID as pre-serialized JSON"""
+    return MOCK_ASSET_JSON_BY_ID.get(asset_id)
 
-    # REPAIR - Targeted repairs (medium cost, moderate risk reduction)
-    # Available for poor/fair/good condition
-    if asset.condition in ["poor", "fair", "good"]:
-        repair_cost = replacement_cost * random.uniform(0.25, 0.40)
-        interventions.append({
-            "intervention_type": "repair",
-            "description": f"Targeted repairs to critical components",
-            "estimated_cost": round(repair_cost, 2),
-            "expected_risk_reduction": round(min(0.65, probability_of_failure * 0.70), 4)
-        })
 
-    # PREVENTIVE_MAINTENANCE - Proactive maintenance (low-medium cost, moderate risk reduction)
-    # Available for fair/good/excellent condition
-    if asset.condition in ["fair", "good", "excellent"]:
-        maint_cost = replacement_cost * random.uniform(0.10, 0.20)
-        interventions.append({
-            "intervention_type": "preventive_maintenance",
-            "description": f"Enhanced preventive maintenance program",
-            "estimated_cost": round(maint_cost, 2),
-            "expected_risk_reduction": round(min(0.50, probability_of_failure * 0.55), 4)
-        })
+class InterventionProto(NamedTuple):
+    """Static part of an intervention option; cost and risk reduction scale per asset"""
+    intervention_type: str
+    description: str            # May reference the asset as {name}
+    cost_ratio: float           # Fraction of the asset's replacement cost
+    risk_cap: float             # Maximum expected risk reduction
+    risk_ratio: float           # Risk reduction as a fraction of failure probability
+    conditions: frozenset[str]  # Asset conditions the intervention is offered for
 
+
+# Intervention catalogue, most to least invasive.
+# Cost ratios are fixed at the midpoint of the ranges previously sampled per call.
+_INTERVENTIONS = (
+    # REPLACE - Complete replacement (highest cost, highest risk reduction)
+    InterventionProto("replace", "Complete replacement of {name}", 1.0, 0.95, 0.98,
+                      frozenset({"critical", "poor", "fair"})),
+    # REHABILITATE - Major overhaul (medium-high cost, good risk reduction)
+    InterventionProto("rehabilitate", "Major rehabilitation and system upgrade", 0.625, 0.80, 0.85,
+                      frozenset({"poor", "fair"})),
+    # REPAIR - Targeted repairs (medium cost, moderate risk reduction)
+    InterventionProto("repair", "Targeted repairs to critical components", 0.325, 0.65, 0.70,
+                      frozenset({"poor", "fair", "good"})),
+    # PREVENTIVE_MAINTENANCE - Proactive maintenance (low-medium cost, moderate risk reduction)
+    InterventionProto("preventive_maintenance", "Enhanced preventive maintenance program", 0.15, 0.50, 0.55,
+                      frozenset({"fair", "good", "excellent"})),
     # MONITORING - Condition monitoring system (low cost, lower risk reduction)
-    # Available for all conditions as a supplementary measure
-    if asset.condition in ["good", "fair", "poor"]:
-        monitor_cost = replacement_cost * random.uniform(0.05, 0.12)
-        interventions.append({
-            "intervention_type": "monitoring",
-            "description": f"Install advanced condition monitoring system",
-            "estimated_cost": round(monitor_cost, 2),
-            "expected_risk_reduction": round(min(0.30, probability_of_failure * 0.35), 4)
-        })
+    InterventionProto("monitoring", "Install advanced condition monitoring system", 0.085, 0.30, 0.35,
+                      frozenset({"good", "fair", "poor"})),
+)
 
-    return interventions
+# Interventions available for each asset condition, in catalogue order
+INTERVENTION_TEMPLATES: dict[str, tuple[InterventionProto, ...]] = {
+    condition: tuple(proto for proto in _INTERVENTIONS if condition in proto.conditions)
+    for condition in CONDITIONS
+}
 
 
-def calculate_mock_risk(asset: Asset, horizon_months: int) -> dict:
-    """Calculate mock risk scores for an asset"""
-    # Simple risk model based on condition and age
-    condition_scores = {
-        "excellent": 0.05,
-        "good": 0.15,
-        "fair": 0.35,
-        "poor": 0.65,
-        "critical": 0.90
-    }
+def generate_intervention_options(asset: Asset, probability_of_failure: float) -> list[dict]:
+    """Generate intervention options based on asset condition and risk.
 
-    base_prob = condition_scores.get(asset.condition, 0.5)
+    Returns a list of intervention options with costs and expected risk reductions.
+    The options are tailored to the asset's condition and type.
+    """
+    return [
+        {
+            "intervention_type": proto.intervention_type,
+            "description": proto.description.format(name=asset.name),
+            "estimated_cost": round(asset.replacement_cost * proto.cost_ratio, 2),
+            "expected_risk_reduction": round(min(proto.risk_cap, probability_of_failure * proto.risk_ratio), 4)
+        }
+        for proto in INTERVENTION_TEMPLATES.get(asset.condition, ())
+    ]
+
+
+# Simple risk model based on condition and age
+CONDITION_SCORES = {
+    "excellent": 0.05,
+    "good": 0.15,
+    "fair": 0.35,
+    "poor": 0.65,
+    "critical": 0.90
+}
+
+
+def _static_risk_factors(asset: Asset) -> tuple[float, float]:
+    """Horizon-independent risk inputs: (base probability x age factor, consequence)"""
+    base_prob = CONDITION_SCORES.get(asset.condition, 0.5)
 
     # Adjust for age vs expected life
     age_factor = asset.current_age_years / asset.expected_life_years
     if age_factor > 1.0:
         age_factor = 1.0 + (age_factor - 1.0) * 0.5  # Accelerate after expected life
 
+    # Consequence based on replacement cost
+    consequence = min(asset.replacement_cost / 500000 * 5, 10.0)
+
+    return base_prob * age_factor, consequence
+
+
+# Mock assets never change, so their static risk inputs are computed once
+RISK_FACTORS_BY_ID = {asset.id: _static_risk_factors(asset) for asset in MOCK_ASSETS}
+
+
+def calculate_mock_risk(asset: Asset, horizon_months: int) -> dict:
+    """Calculate mock risk scores for an asset"""
+    return calculate_mock_risk_batch([asset], horizon_months)[0]
+
+
+def calculate_mock_risk_batch(assets: list[Asset], horizon_months: int) -> list[dict]:
+    """Calculate mock risk scores for several assets over the same horizon"""
     # Adjust for horizon
     horizon_factor = (horizon_months / 12) ** 0.5  # Square root for time adjustment
 
-    probability = min(base_prob * age_factor * horizon_factor, 0.99)
+    return [_risk_for_asset(asset, horizon_factor) for asset in assets]
 
-    # Consequence based on replacement cost
-    consequence = min(asset.replacement_cost / 500000 * 5, 10.0)
+
+def _risk_for_asset(asset: Asset, horizon_factor: float) -> dict:
+    """Apply the horizon factor to an asset's static risk inputs"""
+    factors = RISK_FACTORS_BY_ID.get(asset.id)
+    if factors is None:
+        factors = _static_risk_factors(asset)
+    weighted_prob, consequence = factors
+
+    probability = min(weighted_prob * horizon_factor, 0.99)
 
     risk_score = probability * consequence
 
@@ -182,19 +214,15 @@ def calculate_mock_risk(asset: Asset, horizon_months: int) -> dict:
     }
 
 
+def _roi(candidate) -> float:
+    """Risk reduction per unit cost (0 for zero-cost candidates)"""
+    return candidate.expected_risk_reduction / candidate.cost if candidate.cost > 0 else 0
+
+
 def optimize_mock_investments(candidates: list, budget: float, horizon_months: int) -> dict:
     """Simple greedy optimization - select highest ROI investments within budget"""
-    # Calculate ROI for each candidate
-    candidates_with_roi = []
-    for c in candidates:
-        roi = c.expected_risk_reduction / c.cost if c.cost > 0 else 0
-        candidates_with_roi.append({
-            "candidate": c,
-            "roi": roi
-        })
-
     # Sort by ROI descending
-    candidates_with_roi.sort(key=lambda x: x["roi"], reverse=True)
+    ranked = sorted(candidates, key=_roi, reverse=True)
 
     # Greedy selection
     selected = []
@@ -202,8 +230,7 @@ def optimize_mock_investments(candidates: list, budget: float, horizon_months: i
     total_risk_reduction = 0
     rank = 1
 
-    for item in candidates_with_roi:
-        c = item["candidate"]
+    for c in ranked:
         if budget_used + c.cost <= budget:
             selected.append({
                 "asset_id": c.asset_id,
@@ -8,18 +8,21 @@ Usage:
     python start_servers.py --debug  # Debug mode (QuickEdit enabled for copy/paste)
 """
 import argparse
-import ctypes
 import subprocess
 import shutil
+import socket
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=1)
 def find_windows_terminal():
-    """Find Windows Terminal executable"""
-    # Check if wt.exe is in PATH
-    wt_path = shutil.which('wt.exe') or shutil.which('wt')
+    """Find Windows Terminal executable (detected once per run)"""
+    # Check if wt.exe is in PATH (on Windows, which() tries each PATHEXT extension)
+    wt_path = shutil.which('wt')
     if wt_path:
         return wt_path
 
@@ -39,58 +42,175 @@ def find_windows_terminal():
     return None
 
 
-def start_server_process(name, command, cwd=None, wt_path=None, debug_mode=False):
-    """Start a server in a new Windows Terminal tab or PowerShell window.
+def popen_detached(args, creationflags=0):
+    """Start a process that keeps running after the launcher exits.
+
+    The child breaks away from the launcher's job object where that is
+    allowed; if the job forbids breakaway, it is started normally.
+
+    Args:
+        args: Command line as a list of arguments
+        creationflags: Additional Windows process creation flags
+    """
+    # Quote the command line once, so the fallback launch reuses it. The
+    # launcher holds no handles worth hiding, so inheritance isn't restricted
+    cmdline = subprocess.list2cmdline(args)
+    try:
+        return subprocess.Popen(
+            cmdline, close_fds=False, creationflags=creationflags | subprocess.CREATE_BREAKAWAY_FROM_JOB
+        )
+    except OSError:
+        return subprocess.Popen(cmdline, close_fds=False, creationflags=creationflags)
+
+
+def wait_port(port, timeout=30):
+    """Wait until a server is accepting connections on a local port.
+
+    Args:
+        port: TCP port to probe on 127.0.0.1
+        timeout: Maximum time to wait in seconds
+
+    Returns:
+        True if the port accepted a connection before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.25):
+                return True
+        except OSError:
+            time.sleep(0.1)
+
+    print(f"  (Warning: nothing listening on port {port} after {timeout}s, continuing)")
+    return False
+
+
+def project_python_command(base_dir):
+    """Resolve the project's uv environment once and return a command prefix for its Python.
+
+    `uv run` checks (and if needed syncs) the environment on every call; doing
+    that once here lets each server start the environment's interpreter
+    directly. Falls back to `uv run python` if uv can't be run from here.
+
+    Args:
+        base_dir: Project root containing pyproject.toml
+
+    Returns:
+        PowerShell command prefix that runs the project interpreter
+    """
+    try:
+        result = subprocess.run(
+            ['uv', 'run', 'python', '-c', 'import sys; print(sys.executable)'],
+            cwd=base_dir, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"  (Could not resolve the uv environment up front: {e})")
+        return "uv run python"
+
+    return f'& "{result.stdout.strip()}"'
+
+
+# Named Windows Terminal window that all server tabs are opened in
+WT_WINDOW_NAME = "capital-planning"
+
+# How long to wait for the guardrail server to load its models (seconds)
+GUARDRAIL_STARTUP_TIMEOUT = 120
+
+# Server launch table: (title, python -m arguments, subdirectory, port).
+# The agent checks the guardrail server when it starts, so it (and the
+# frontend) are launched only once the guardrail server is accepting requests
+BACKEND_SERVERS = [
+    ("OIDC Server (port 8000)", "oidc_server.main", None, 8000),
+    ("Services API (port 8001)", "services.main", None, 8001),
+    ("MCP Server (streamable-http on port 8002)", "mcp_server.main", None, 8002),
+    # Guardrail Server loads ML models, may take longer
+    ("Guardrail Server (port 8004)", "guardrails.guardrail_server", None, 8004),
+]
+FRONTEND_SERVERS = [
+    ("Agent Service (port 8003)", "agent.main", None, 8003),
+    # http.server is already threaded; HTTP/1.1 lets the browser reuse one
+    # keep-alive connection for all of the page's assets
+    ("Frontend Server (port 8080)", "http.server 8080 --protocol HTTP/1.1", "frontend", 8080),
+]
+
+
+def build_tab_args(name, command, cwd):
+    """Build the Windows Terminal new-tab action for one server.
+
+    Args:
+        name: Tab title
+        command: Command to run (must not contain ';', which wt treats as an action separator)
+        cwd: Working directory
+    """
+    return [
+        'new-tab',
+        '--title', name,
+        '-d', str(cwd),
+        'powershell.exe', '-NoExit', '-Command', command
+    ]
+
+
+def start_wt_tabs(wt_path, servers):
+    """Open several servers as tabs in a single Windows Terminal invocation.
+
+    Tabs are chained with ';' actions and targeted at one named window, so
+    wt starts once for the whole group and every tab lands in the same window.
+
+    Args:
+        wt_path: Path to Windows Terminal
+        servers: List of (name, command, cwd, port) tuples
+    """
+    wt_args = [wt_path, '-w', WT_WINDOW_NAME]
+    for i, (name, command, cwd, _port) in enumerate(servers):
+        print(f"Starting {name}...")
+        if i:
+            wt_args.append(';')
+        wt_args.extend(build_tab_args(name, command, cwd))
+
+    # wt hands the tabs to its own window process, so it needs no console of ours
+    return popen_detached(wt_args, creationflags=subprocess.DETACHED_PROCESS)
+
+
+def start_server_process(name, command, cwd=None, debug_mode=False):
+    """Start a server in a new PowerShell window.
 
     Args:
         name: Display name for the server
         command: Command to run
         cwd: Working directory
-        wt_path: Path to Windows Terminal (if available)
         debug_mode: If True, don't disable QuickEdit (allows copy/paste)
     """
     print(f"Starting {name}...")
 
     working_dir = str(cwd) if cwd else str(Path.cwd())
 
-    if wt_path:
-        # Use Windows Terminal (no QuickEdit issues)
-        wt_args = [
-            wt_path,
-            'new-tab',
-            '--title', name,
-            '-d', working_dir,
-            'powershell.exe', '-NoExit', '-Command', command
+    if debug_mode:
+        # Debug mode: don't disable QuickEdit, allowing copy/paste
+        ps_args = [
+            'powershell.exe',
+            '-NoExit',
+            '-Command',
+            f'$Host.UI.RawUI.WindowTitle = "{name}"; cd "{working_dir}"; {command}'
         ]
-        process = subprocess.Popen(wt_args)
     else:
-        if debug_mode:
-            # Debug mode: don't disable QuickEdit, allowing copy/paste
-            ps_args = [
-                'powershell.exe',
-                '-NoExit',
-                '-Command',
-                f'$Host.UI.RawUI.WindowTitle = "{name}"; cd "{working_dir}"; {command}'
-            ]
-        else:
-            # Normal mode: disable QuickEdit to prevent freezing on click
-            disable_quickedit = (
-                "import ctypes; "
-                "k=ctypes.windll.kernel32; "
-                "h=k.GetStdHandle(-10); "
-                "m=ctypes.c_ulong(); "
-                "k.GetConsoleMode(h,ctypes.byref(m)); "
-                "k.SetConsoleMode(h,(m.value&~64)|128)"
-            )
-            wrapper_cmd = f'python -c "{disable_quickedit}"; {command}'
-            ps_args = [
-                'powershell.exe',
-                '-NoExit',
-                '-Command',
-                f'$Host.UI.RawUI.WindowTitle = "{name}"; cd "{working_dir}"; {wrapper_cmd}'
-            ]
-
-        process = subprocess.Popen(ps_args, creationflags=subprocess.CREATE_NEW_CONSOLE)
+        # Normal mode: disable QuickEdit to prevent freezing on click
+        disable_quickedit = (
+            "import ctypes; "
+            "k=ctypes.windll.kernel32; "
+            "h=k.GetStdHandle(-10); "
+            "m=ctypes.c_ulong(); "
+            "k.GetConsoleMode(h,ctypes.byref(m)); "
+            "k.SetConsoleMode(h,(m.value&~64)|128)"
+        )
+        wrapper_cmd = f'python -c "{disable_quickedit}"; {command}'
+        ps_args = [
+            'powershell.exe',
+            '-NoExit',
+            '-Command',
+            f'$Host.UI.RawUI.WindowTitle = "{name}"; cd "{working_dir}"; {wrapper_cmd}'
+        ]
+
+    process = popen_detached(ps_args, creationflags=subprocess.CREATE_NEW_CONSOLE)
 
     return process
 
@@ -123,67 +243,43 @@ def main():
             print("(Tip: Install Windows Terminal to avoid QuickEdit freezing issues)")
     print()
 
-    # Start OIDC server
-    start_server_process(
-        "OIDC Server (port 8000)",
-        "uv run python -m oidc_server.main",
-        cwd=base_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
-    time.sleep(2)
-
-    # Start Services
-    start_server_process(
-        "Services API (port 8001)",
-        "uv run python -m services.main",
-        cwd=base_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
-    time.sleep(2)
-
-    # Start MCP Server
-    start_server_process(
-        "MCP Server (streamable-http on port 8002)",
-        "uv run python -m mcp_server.main",
-        cwd=base_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
-    time.sleep(2)
-
-    # Start Guardrail Server (loads ML models, may take longer)
-    start_server_process(
-        "Guardrail Server (port 8004)",
-        "uv run python -m guardrails.guardrail_server",
-        cwd=base_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
-    # Allow extra time for ML models to load
+    # Resolve the uv environment once; servers run its interpreter directly
+    python_cmd = project_python_command(base_dir)
+
+    def resolve(servers):
+        return [
+            (name, f"{python_cmd} -m {module}", base_dir / subdir if subdir else base_dir, port)
+            for name, module, subdir, port in servers
+        ]
+
+    backend_servers = resolve(BACKEND_SERVERS)
+    frontend_servers = resolve(FRONTEND_SERVERS)
+
+    def start_group(servers):
+        if wt_path:
+            # One wt invocation per group instead of one per server
+            start_wt_tabs(wt_path, servers)
+        else:
+            # Servers are independent, so their windows are spawned concurrently
+            with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+                futures = [
+                    executor.submit(start_server_process, name, command, cwd=cwd, debug_mode=args.debug)
+                    for name, command, cwd, _port in servers
+                ]
+            for future in futures:
+                future.result()  # Re-raise any launch failure
+
+    start_group(backend_servers)
+
+    # The port only opens once the ML models have loaded
     print("  (Waiting for guardrail models to load...)")
-    time.sleep(10)
-
-    # Start Agent Service
-    start_server_process(
-        "Agent Service (port 8003)",
-        "uv run python -m agent.main",
-        cwd=base_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
-    time.sleep(2)
-
-    # Start Frontend
-    frontend_dir = base_dir / "frontend"
-    start_server_process(
-        "Frontend Server (port 8080)",
-        "uv run python -m http.server 8080",
-        cwd=frontend_dir,
-        wt_path=wt_path,
-        debug_mode=args.debug
-    )
+    wait_port(8004, timeout=GUARDRAIL_STARTUP_TIMEOUT)
+
+    start_group(frontend_servers)
+
+    # Wait for every server to accept connections before reporting success
+    for _name, _command, _cwd, port in backend_servers + frontend_servers:
+        wait_port(port)
 
     print()
     print("=" * 70)